@@ -10,19 +10,41 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
+from pandas.api.types import union_categoricals
 
 from utils import (
     load_config,
+    copy_on_write,
     smart_read_csv,
     ensure_dir,
     find_files,
-    apply_filters,
+    compile_filters,
     transpose_wide_format,
-    format_output_filename
+    read_wide_format,
+    WIDE_FORMAT_MARKERS,
+    categorize_strings,
+    concat_frames,
+    coerce_numeric,
+    numeric_or_text,
+    downcast_numeric,
+    factorize_keys,
+    compile_system_order,
+    pivot_first_blocks,
+    inputs_fingerprint,
+    read_data_cache,
+    write_data_cache,
+    format_output_filename,
+    apply_output_format,
+    export_dataframe
 )
 
 
+# xlsxwriter 逐行写出（constant_memory）；_apply_excel_formatting 按行顺序写入所有单元格
+EXCEL_WRITER_KWARGS = {'options': {'constant_memory': True}}
+
+
 class InferenceDataIntegration:
     """推理数据整合处理器"""
     
@@ -36,6 +58,10 @@ class InferenceDataIntegration:
         self.config = load_config(config_path)
         self.data: Optional[pd.DataFrame] = None
         
+        # 配置在处理过程中不变：字段列表与过滤函数只解析一次
+        self._numeric_fields = self._get_numeric_fields()
+        self._filter_fn = compile_filters(self.config.get('filters', []))
+        
     def load_data(self) -> pd.DataFrame:
         """
         加载并合并所有输入数据
@@ -62,25 +88,60 @@ class InferenceDataIntegration:
         
         print(f"找到 {len(files)} 个文件")
         
+        # 输入文件未变化时直接读取上次合并结果的缓存
+        fingerprint = inputs_fingerprint(files) if input_config.get('cache', True) else None
+        if fingerprint:
+            cached = read_data_cache(fingerprint)
+            if cached is not None:
+                self.data = cached
+                print(f"输入文件未变化，从缓存加载 {len(self.data)} 条记录")
+                return self.data
+        
+        # 多线程并发读取（CSV 解析在 C 层释放 GIL），结果按文件顺序收集
         all_data = []
-        for file_path in files:
-            try:
-                df = self._load_single_file(file_path)
-                # 添加源文件信息
-                df['_source_file'] = os.path.basename(file_path)
-                all_data.append(df)
-                print(f"  ✓ 已加载: {os.path.basename(file_path)}")
-            except Exception as e:
-                print(f"  ✗ 加载失败: {os.path.basename(file_path)} - {e}")
+        with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+            futures = [executor.submit(self._load_source_file, p) for p in files]
+            for file_path, future in zip(files, futures):
+                try:
+                    df = future.result()
+                    all_data.append(df)
+                    print(f"  ✓ 已加载: {os.path.basename(file_path)}")
+                except Exception as e:
+                    print(f"  ✗ 加载失败: {os.path.basename(file_path)} - {e}")
         
         if not all_data:
             raise ValueError("没有成功加载任何数据")
         
-        self.data = pd.concat(all_data, ignore_index=True)
+        if len(all_data) == 1:
+            # 单个文件无需 concat，避免整表复制；仅在索引不连续时重建索引
+            df = all_data[0]
+            self.data = df if df.index.equals(pd.RangeIndex(len(df))) else df.reset_index(drop=True)
+        else:
+            self.data = concat_frames(all_data)
         print(f"总计加载 {len(self.data)} 条记录")
         
+        if fingerprint:
+            write_data_cache(self.data, fingerprint)
+        
         return self.data
     
+    def _load_source_file(self, file_path: str) -> pd.DataFrame:
+        """
+        加载单个文件并添加源文件信息（在线程池中执行）
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            带 _source_file 列的 DataFrame
+        """
+        df = self._load_single_file(file_path)
+        # 整列只有一个取值，用 category 存储：一份字符串 + int8 编码
+        df['_source_file'] = pd.Categorical.from_codes(
+            np.zeros(len(df), dtype=np.int8), categories=[os.path.basename(file_path)]
+        )
+        return df
+    
     def _load_single_file(self, file_path: str) -> pd.DataFrame:
         """
         加载单个 CSV 文件（处理宽格式转置）
@@ -91,17 +152,26 @@ class InferenceDataIntegration:
         Returns:
             转置后的 DataFrame
         """
-        raw_df = smart_read_csv(file_path, header=None)
-        
-        # 检查是否为宽格式（首列包含 field_name）
-        first_col = raw_df.iloc[:, 0].astype(str)
-        if 'field_name' in first_col.values or 'model_name' in first_col.values:
+        # 首个单元格即为字段名标记的宽格式文件按行解析后直接转置
+        df = read_wide_format(file_path)
+        if df is not None:
+            return categorize_strings(df)
+        
+        # 原始单元格一律按文本读取：首行（表头或 field_name 行）本就使每列都是文本，
+        # 指定类型可跳过逐列推断，也避免 pandas 分块推断出字符串与浮点混杂的列；
+        # 数值字段在 preprocess 中统一转换
+        raw_df = smart_read_csv(file_path, header=None, dtype=str)
+        
+        # 检查是否为宽格式（首列包含 field_name）；单元格已是文本，直接按值查找
+        if raw_df.iloc[:, 0].isin(WIDE_FORMAT_MARKERS).any():
             # 宽格式，需要转置
-            return transpose_wide_format(raw_df)
+            df = transpose_wide_format(raw_df)
         else:
             # 标准格式，设置首行为列名并返回（复用已读取的数据）
             raw_df.columns = raw_df.iloc[0]
-            return raw_df.iloc[1:].reset_index(drop=True)
+            df = raw_df.iloc[1:].reset_index(drop=True)
+        
+        return categorize_strings(df)
     
     def preprocess(self) -> pd.DataFrame:
         """
@@ -113,20 +183,26 @@ class InferenceDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
         
-        df = self.data.copy()
+        # 不做防御性复制：过滤会生成新对象，类型转换的结果本就要写回 self.data
+        df = self.data
         
         # 应用过滤器
         filters = self.config.get('filters', [])
         if filters:
             original_count = len(df)
-            df = apply_filters(df, filters)
+            df = self._filter_fn(df)
             print(f"过滤器应用: {original_count} -> {len(df)} 条记录")
         
         # 数值类型转换
-        numeric_fields = self._get_numeric_fields()
-        for field in numeric_fields:
-            if field in df.columns:
-                df[field] = pd.to_numeric(df[field], errors='coerce')
+        numeric_fields = self._numeric_fields
+        valid_fields = [f for f in dict.fromkeys(numeric_fields) if f in df.columns]
+        if valid_fields:
+            # 一次性批量转换，无法解析的值置为 NaN
+            df[valid_fields] = df[valid_fields].apply(coerce_numeric)
+        
+        # 数值列降精度（float32 需在 analysis.numeric_precision 中显式开启）
+        precision = self.config.get('analysis', {}).get('numeric_precision', 'float64')
+        downcast_numeric(df, numeric_fields, precision)
         
         self.data = df
         return df
@@ -156,7 +232,8 @@ class InferenceDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
         
-        df_raw = self.data.copy()
+        # 以下步骤只读取 df_raw，派生列写入各自的新对象
+        df_raw = self.data
         iv_config = self.config.get('independent_variables', {})
         analysis_config = self.config.get('analysis', {})
         dependent_vars = self.config.get('dependent_variables', [])
@@ -182,69 +259,85 @@ class InferenceDataIntegration:
         if derived_config.get('enabled', False):
             npu_field = derived_config.get('npu_count_field', 'decoder_num_npu')
             
-            # 整机/多卡行：标记为 'total' 类型
-            df_total = df_raw.copy()
-            npu_vals = pd.to_numeric(df_total[npu_field], errors='coerce')
-            df_total['_metric_label'] = npu_vals.apply(lambda x: f'{int(x)}卡' if pd.notna(x) else '整机')
-            df_total['_row_type'] = 'total' # 用于归一化对齐
-            for prefix, m in metric_groups.items():
-                if m["total"]: df_total[f"_val_{prefix}"] = df_total[m["total"]]
-            df_total['_sort_order'] = 0
+            # 整机/多卡行（total）在前、单卡行（single）在后，只复制透视需要的键列；
+            # 各列按两段拼接后收集到字典，最后一次构造 DataFrame，避免逐列插入
+            n = len(df_raw)
+            col_fields = [f.get('field') for f in iv_config.get('column_fields', [])]
+            key_fields = [f for f in dict.fromkeys(row_fields + col_fields) if f and f in df_raw.columns]
+            columns = {f: pd.concat([df_raw[f], df_raw[f]], ignore_index=True) for f in key_fields}
+            
+            npu_vals = coerce_numeric(df_raw[npu_field])
+            single_labels = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=['单卡'])
+            columns['_metric_label'] = union_categoricals(
+                [self._npu_count_labels(npu_vals), single_labels], sort_categories=True
+            )
+            columns['_sort_order'] = np.repeat(np.array([0, 1], dtype=np.int8), n)
+            # _row_type 用于归一化对齐
+            columns['_row_type'] = pd.Categorical.from_codes(
+                np.repeat(np.array([1, 0], dtype=np.int8), n), categories=['single', 'total']
+            )
             
-            # 单卡行：标记为 'single' 类型
-            df_single = df_raw.copy()
-            df_single['_metric_label'] = '单卡'
-            df_single['_row_type'] = 'single'
+            missing = pd.Series(np.nan, index=df_raw.index)
             for prefix, m in metric_groups.items():
-                source_field = m["single"] if m["single"] else m["total"]
-                if source_field: df_single[f"_val_{prefix}"] = df_single[source_field]
-            df_single['_sort_order'] = 1
+                single_source = m["single"] if m["single"] else m["total"]
+                if not single_source:
+                    continue
+                total_part = df_raw[m["total"]] if m["total"] else missing
+                columns[f"_val_{prefix}"] = pd.concat([total_part, df_raw[single_source]], ignore_index=True)
+            df = pd.DataFrame(columns, copy=False)
             
-            df = pd.concat([df_total, df_single], ignore_index=True)
             row_fields_ext = row_fields + ['_metric_label', '_sort_order', '_row_type']
             pivot_targets = [(prefix, f"_val_{prefix}") for prefix in metric_groups.keys()]
         else:
-            df = df_raw.copy()
-            df['_row_type'] = 'default'
-            row_fields_ext = row_fields + ['_row_type']
             pivot_targets = [(dv.get('prefix', dv.get('alias', dv.get('field'))), dv.get('field')) for dv in dependent_vars]
+            # 只取透视用到的键列与指标列，不复制整表
+            col_fields = [f.get('field') for f in iv_config.get('column_fields', [])]
+            used_fields = row_fields + col_fields + [target for _, target in pivot_targets]
+            df = df_raw.loc[:, [f for f in dict.fromkeys(used_fields) if f and f in df_raw.columns]]
+            df['_row_type'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=['default'])
+            row_fields_ext = row_fields + ['_row_type']
 
         # 3. 构建多维列透视
         col_fields = [f.get('field') for f in iv_config.get('column_fields', [])]
         col_fields = [f for f in col_fields if f and f in df.columns]
         
-        pivot_blocks = []
+        # 行、列键只编码一次，各指标的透视共用
+        row_keys = factorize_keys(df, row_fields_ext)
+        col_keys = factorize_keys(df, col_fields) if col_fields else None
+        
+        blocks = []
         for prefix, target_field in pivot_targets:
             if target_field not in df.columns: continue
             
-            # Prefill 是固定值，不随 TPOT (time_limit) 变化，只输出单列
+            # Prefill 是固定值，不随 TPOT (time_limit) 变化，只输出单列（取第一个值）；
+            # Decode 指标按 time_limit 展开多列
             is_prefill = 'prefill' in prefix.lower()
-            
-            if col_fields and not is_prefill:
-                # Decode 指标：按 time_limit 展开多列
-                pivot = df.pivot_table(index=row_fields_ext, columns=col_fields, values=target_field, aggfunc='first')
-                pivot = pivot.reindex(columns=sorted(pivot.columns, reverse=True))
-                new_cols = []
-                for col_tuple in pivot.columns:
-                    vals = col_tuple if isinstance(col_tuple, (list, tuple)) else [col_tuple]
-                    col_label = "_".join([str(v) for v in vals])
-                    unit = "ms" if any(kw in str(col_fields).lower() for kw in ['time', 'limit']) else ""
-                    new_cols.append(f"{prefix}_{col_label}{unit}")
-                pivot.columns = new_cols
-            else:
-                # Prefill 指标或无列字段：只输出单列（取第一个值）
-                pivot = df.groupby(row_fields_ext)[target_field].first().to_frame()
-                pivot.columns = [prefix]
-            pivot_blocks.append(pivot)
+            blocks.append((prefix, df[target_field], col_keys if col_fields and not is_prefill else None))
 
-        # 4. 合并结果并强制进行数值化（解决 Input Length 10 < 9 的排序问题）
-        result = pd.concat(pivot_blocks, axis=1).reset_index()
+        # 4. 所有指标一次透视到同一张宽表，展开列按列键降序并重命名
+        result = pivot_first_blocks(row_keys, blocks, descending=True)
+        unit = "ms" if any(kw in str(col_fields).lower() for kw in ['time', 'limit']) else ""
+        # 各指标块展开出相同的列键，每个列键只格式化一次后缀
+        suffixes = {}
+        new_cols = []
+        for col in result.columns:
+            if isinstance(col, tuple):
+                prefix, key = col
+                suffix = suffixes.get(key)
+                if suffix is None:
+                    vals = key if isinstance(key, (list, tuple)) else [key]
+                    suffix = suffixes[key] = f"{'_'.join(str(v) for v in vals)}{unit}"
+                col = f"{prefix}_{suffix}"
+            new_cols.append(col)
+        result.columns = new_cols
+        
+        # 强制进行数值化（解决 Input Length 10 < 9 的排序问题）
+        result = result.reset_index()
         
         for field in row_fields:
             if field in result.columns:
                 # 尝试转换为数字，确保排序正确
-                s = pd.to_numeric(result[field], errors='coerce')
-                result[field] = s.fillna(result[field])
+                result[field] = numeric_or_text(result[field])
 
         # 5. 归一化计算：基于 _row_type 匹配，解决 128卡 vs 8卡 匹配失败的问题
         baseline_system = analysis_config.get('normalization_baseline')
@@ -256,62 +349,51 @@ class InferenceDataIntegration:
             # 关键：使用 _row_type (total/single) 进行匹配，而不是具体的 _metric_label
             match_cols = [c for c in row_fields_ext if c not in [system_field, '_sort_order', '_metric_label']]
             
-            baseline_df = result[result[system_field] == baseline_system].copy()
+            base_rows = (result[system_field] == baseline_system).to_numpy()
             
-            if not baseline_df.empty:
-                for col in data_cols:
-                    norm_col_name = f"{col}_norm"
-                    temp_baseline = baseline_df[match_cols + [col]].rename(columns={col: '_base_val'})
-                    # 通过 match_cols (Model, Input Length, _row_type) 关联
+            if base_rows.any():
+                # match_cols (Model, Input Length, _row_type) 联合编码为一个整数键，
+                # 每行按键直接定位到对应的基准行，省去多列合并
+                codes, keys_index = factorize_keys(result, match_cols)
+                base_codes = codes[base_rows]
+                if (codes >= 0).all() and len(np.unique(base_codes)) == len(base_codes):
+                    base_pos = np.full(len(keys_index), -1, dtype=np.intp)
+                    base_pos[base_codes] = np.flatnonzero(base_rows)
+                    src = base_pos[codes]
+                    matched = src >= 0
+                    for col in data_cols:
+                        base = np.where(matched, result[col].to_numpy()[src], np.nan)
+                        result[f"{col}_norm"] = (result[col] / base).round(2)
+                else:
+                    # 键含缺失值或基准行的键重复时，按多列合并关联（保持 merge 的匹配语义）；
+                    # 所有指标列的基准值一次关联进来（按位置命名，避免与原列名冲突）
+                    base_names = [f"_base_{i}" for i in range(len(data_cols))]
+                    temp_baseline = result.loc[base_rows, match_cols + data_cols].set_axis(match_cols + base_names, axis=1)
                     merged = pd.merge(result[match_cols], temp_baseline, on=match_cols, how='left')
-                    result[norm_col_name] = (result[col] / merged['_base_val']).round(2)
+                    for col, base_name in zip(data_cols, base_names):
+                        result[f"{col}_norm"] = (result[col] / merged[base_name]).round(2)
 
+        # 以下只确定列顺序与行顺序，最后一次性取出行列并重命名，
+        # 省去重排列、插入/删除辅助列、排序各自生成一份整表
         # 6. 自定义列排序：Prefill 在 Decode 之前
         metric_order = analysis_config.get('metric_order', [])
+        columns = list(result.columns)
         if metric_order:
             data_cols = [c for c in result.columns if c not in row_fields_ext]
-            ordered_cols = []
-            for prefix in metric_order:
-                for col in data_cols:
-                    if col.startswith(prefix) and col not in ordered_cols:
-                        ordered_cols.append(col)
-            # 添加未匹配的列
-            for col in data_cols:
-                if col not in ordered_cols:
-                    ordered_cols.append(col)
-            # 重新排列列顺序
-            result = result[list(row_fields_ext) + ordered_cols]
+            # 每列归入第一个匹配的前缀，未匹配的列排在最后；稳定排序保持同组内的原有顺序
+            unmatched = len(metric_order)
+            prefix_rank = lambda col: next(
+                (i for i, prefix in enumerate(metric_order) if col.startswith(prefix)), unmatched
+            )
+            columns = list(row_fields_ext) + sorted(data_cols, key=prefix_rank)
         
         # 7. 自定义行排序：按 system_order 排序（支持 *POR*, *LEG* 模式）
         system_order = analysis_config.get('system_order', [])
         # system_field 已在归一化阶段查找，此处复用
         
         if system_order and system_field and system_field in result.columns:
-            def get_system_sort_key(system_name):
-                """根据 system_order 配置返回排序优先级"""
-                for idx, pattern in enumerate(system_order):
-                    if pattern.startswith('*') and pattern.endswith('*'):
-                        # contains 模式: *POR* -> 包含 "POR"
-                        keyword = pattern[1:-1].upper()
-                        if keyword in str(system_name).upper():
-                            return idx
-                    elif pattern.startswith('*'):
-                        # 后缀模式: *_POR
-                        suffix = pattern[1:].upper()
-                        if str(system_name).upper().endswith(suffix):
-                            return idx
-                    elif pattern.endswith('*'):
-                        # 前缀模式: POR_*
-                        prefix = pattern[:-1].upper()
-                        if str(system_name).upper().startswith(prefix):
-                            return idx
-                    else:
-                        # 精确匹配
-                        if str(system_name).upper() == pattern.upper():
-                            return idx
-                return len(system_order)  # 未匹配的排最后
+            get_system_sort_key = compile_system_order(system_order)
             
-            result['_system_sort'] = result[system_field].apply(get_system_sort_key)
             # 排序优先级：Metric(多卡/单卡) → Model → System (按 system_order) → 剩余 row_fields
             # 找到 system_field 在 row_fields 中的位置，将 _system_sort 插入其后
             if system_field in row_fields:
@@ -322,21 +404,27 @@ class InferenceDataIntegration:
                 sort_keys = (['_sort_order'] if '_sort_order' in result.columns else []) + row_fields[:sys_idx] + ['_system_sort'] + row_fields[sys_idx+1:]
             else:
                 sort_keys = (['_sort_order'] if '_sort_order' in result.columns else []) + ['_system_sort'] + row_fields
-            result = result.sort_values(by=sort_keys, ascending=True)
-            result = result.drop(columns=['_system_sort'])
+            
+            # 只对排序键列排序；每个不同的系统名只匹配一次，再按编码展开到各行
+            keys = result.loc[:, [k for k in dict.fromkeys(sort_keys) if k != '_system_sort']]
+            codes, names = pd.factorize(result[system_field], use_na_sentinel=False)
+            ranks = np.array([get_system_sort_key(name) for name in names], dtype=np.int64)
+            keys['_system_sort'] = ranks[codes]
         else:
             # 默认排序
             sort_keys = (['_sort_order'] if '_sort_order' in result.columns else []) + row_fields
-            result = result.sort_values(by=sort_keys, ascending=True)
+            keys = result.loc[:, list(dict.fromkeys(sort_keys))]
+        rows = result.index.get_indexer(keys.sort_values(by=sort_keys, ascending=True).index)
         
         # 8. 清理内部辅助列
-        cols_to_drop = [c for c in ['_sort_order', '_row_type'] if c in result.columns]
-        result = result.drop(columns=cols_to_drop)
+        columns = [c for c in columns if c not in ('_sort_order', '_row_type')]
+        result = result.iloc[rows, [result.columns.get_loc(c) for c in columns]]
             
         rename_map = {f.get('field'): f.get('alias') for f in iv_config.get('row_fields', [])}
         rename_map['_metric_label'] = 'Metric'
         
-        return result.rename(columns=rename_map)
+        result.columns = [rename_map.get(c, c) for c in columns]
+        return result
 
     
     def build_flat_table(self) -> pd.DataFrame:
@@ -346,7 +434,7 @@ class InferenceDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
             
-        df = self.data.copy()
+        df = self.data
         iv_config = self.config.get('independent_variables', {})
         dependent_vars = self.config.get('dependent_variables', [])
         # 获取配置中优先排序的额外字段列表
@@ -379,14 +467,14 @@ class InferenceDataIntegration:
             if f and f in df.columns and f not in all_display_cols:
                 all_display_cols.append(f)
         
-        result = df[all_display_cols].copy()
+        # loc 按列选取即返回独立的新对象，无需再 copy
+        result = df.loc[:, all_display_cols]
 
         # 2. 数值化转换，确保排序逻辑正确（解决 10 > 9 的问题）
         # 对行索引涉及的字段进行转换，确保按照数值大小排序
         for field in row_fields:
             if field in result.columns:
-                s = pd.to_numeric(result[field], errors='coerce')
-                result[field] = s.fillna(result[field])
+                result[field] = numeric_or_text(result[field])
 
         # 3. 执行升序排列
         # 按照 row_fields 里的定义顺序进行多级排序
@@ -406,6 +494,31 @@ class InferenceDataIntegration:
         # 对于 additional_fields 中的字段，如果没有 alias 定义，将保留原始字段名
         return result.rename(columns=rename_map)
 
+    @staticmethod
+    def _npu_count_labels(npu_vals: pd.Series) -> pd.Categorical:
+        """
+        生成整机行的标签：有卡数时为 "N卡"，否则为 "整机"
+        
+        只对去重后的卡数做字符串格式化，再按编码映射回每一行
+        
+        Args:
+            npu_vals: 数值化后的卡数列
+            
+        Returns:
+            标签 Categorical（类别按字典序排列，分组顺序与字符串列一致）
+        """
+        counts = np.trunc(npu_vals.to_numpy(dtype=np.float64, na_value=np.nan))
+        codes, uniques = pd.factorize(counts)
+        
+        names = np.array([f'{int(u)}卡' for u in uniques] + ['整机'], dtype=object)
+        codes = np.where(codes < 0, len(uniques), codes)
+        
+        # 类别按字典序重排，并同步重映射编码
+        order = np.argsort(names)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return pd.Categorical.from_codes(rank[codes], categories=names[order])
+    
     @staticmethod
     def _apply_excel_formatting(writer, sheet_name: str, df: pd.DataFrame):
         """
@@ -440,30 +553,28 @@ class InferenceDataIntegration:
         for col_idx, col_name in enumerate(df.columns):
             worksheet.write(0, col_idx, col_name, header_format)
         
-        # 写入数据
-        for row_idx in range(len(df)):
-            for col_idx in range(len(df.columns)):
-                value = df.iloc[row_idx, col_idx]
+        # 按行写入数据：按列取出一次 Python 原生值，空值掩码整表一次计算，
+        # 避免逐单元格 iloc 定位；列宽在同一遍历中统计
+        columns = [df.iloc[:, i].tolist() for i in range(df.shape[1])]
+        null_rows = df.isna().to_numpy()
+        col_widths = [len(str(col_name)) for col_name in df.columns]
+        
+        for row_idx, (row, nulls) in enumerate(zip(zip(*columns), null_rows), start=1):
+            for col_idx, value in enumerate(row):
                 # 处理 NaN 值
-                if pd.isna(value):
-                    worksheet.write_blank(row_idx + 1, col_idx, None, cell_format)
+                if nulls[col_idx]:
+                    worksheet.write_blank(row_idx, col_idx, None, cell_format)
                 else:
-                    worksheet.write(row_idx + 1, col_idx, value, cell_format)
+                    worksheet.write(row_idx, col_idx, value, cell_format)
+                    col_widths[col_idx] = max(col_widths[col_idx], len(str(value)))
         
-        # 自动调整列宽（基于内容长度）
-        for col_idx, col_name in enumerate(df.columns):
-            # 取表头和数据中最长的字符串长度
-            max_len = len(str(col_name))
-            for row_idx in range(len(df)):
-                val = df.iloc[row_idx, col_idx]
-                if pd.notna(val):
-                    max_len = max(max_len, len(str(val)))
-            # 设置列宽，加一点余量
-            worksheet.set_column(col_idx, col_idx, max_len + 2)
+        # 自动调整列宽（取表头和数据中最长的字符串长度，加一点余量）
+        for col_idx, width in enumerate(col_widths):
+            worksheet.set_column(col_idx, col_idx, width + 2)
 
     def export(self, df: pd.DataFrame, suffix: str = "") -> str:
         """
-        导出结果到 Excel
+        导出结果（Excel / Parquet / CSV，由 output.format 指定）
         
         Args:
             df: 要导出的 DataFrame
@@ -482,12 +593,17 @@ class InferenceDataIntegration:
         if suffix:
             name, ext = os.path.splitext(filename)
             filename = f"{name}_{suffix}{ext}"
+        output_format = output_config.get('format', 'xlsx')
+        filename = apply_output_format(filename, output_format)
         
         output_path = os.path.join(output_dir, filename)
         
-        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='Sheet1', index=False, header=False, startrow=1)
-            self._apply_excel_formatting(writer, 'Sheet1', df)
+        if output_format != 'xlsx':
+            export_dataframe(df, output_path)
+        else:
+            with pd.ExcelWriter(output_path, engine='xlsxwriter', engine_kwargs=EXCEL_WRITER_KWARGS) as writer:
+                writer.book.add_worksheet('Sheet1')
+                self._apply_excel_formatting(writer, 'Sheet1', df)
         
         print(f"结果已导出: {output_path}")
         
@@ -506,21 +622,28 @@ class InferenceDataIntegration:
         if suffix:
             name, ext = os.path.splitext(filename)
             filename = f"{name}_{suffix}{ext}"
+        output_format = output_config.get('format', 'xlsx')
+        filename = apply_output_format(filename, output_format)
         
         output_path = os.path.join(output_dir, filename)
         
+        # 非 Excel 格式没有 Sheet 的概念，整表导出（保留拆分字段列）
+        if output_format != 'xlsx':
+            export_dataframe(df, output_path)
+            print(f"结果已导出: {output_path}")
+            return output_path
+        
         # 使用 ExcelWriter 写入多个 Sheet
-        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-            # 获取拆分字段的所有唯一值（如不同的 Input Length 数值）
-            unique_vals = sorted(df[split_field].unique())
-            for val in unique_vals:
-                # 1. 过滤当前值的数据
-                # 2. 剔除作为 Sheet 名称的那个字段列
-                sheet_df = df[df[split_field] == val].drop(columns=[split_field])
-                
+        with pd.ExcelWriter(output_path, engine='xlsxwriter', engine_kwargs=EXCEL_WRITER_KWARGS) as writer:
+            # 按拆分字段的唯一值（如不同的 Input Length 数值）升序分组：
+            # 剔除作为 Sheet 名称的字段列后一次分组，避免每个值都对整表做一次布尔过滤
+            groups = df.drop(columns=[split_field]).groupby(df[split_field], sort=True, observed=True)
+            for val, sheet_df in groups:
+
                 # 写入 Sheet，名称为字段值（如 "4096", "8192" 等）
                 sheet_name = str(val)[:31]  # Excel Sheet 名称限制 31 字符
-                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False, header=False, startrow=1)
+                if sheet_name not in writer.sheets:
+                    writer.book.add_worksheet(sheet_name)
                 self._apply_excel_formatting(writer, sheet_name, sheet_df)
         
         print(f"结果已按 '{split_field}' 拆分并导出至: {output_path}")
@@ -581,8 +704,9 @@ def main():
         config_path = sys.argv[1]
     
     try:
-        processor = InferenceDataIntegration(config_path)
-        processor.run()
+        with copy_on_write():
+            processor = InferenceDataIntegration(config_path)
+            processor.run()
     except Exception as e:
         print(f"\n错误: {e}")
         sys.exit(1)
@@ -7,8 +7,12 @@
 """
 
 import os
+import re
 import csv
 import gzip
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
 from common import (
@@ -17,14 +21,28 @@ from common import (
     PARAM_SEPARATOR, CONFIG_YAML_PATH
 )
 
+# 每个结果目录中按优先级查找的结果文件（也支持同名 .gz 压缩文件）
+TARGET_FILES = (
+    "pd-split-request-optimal_result_best.csv",
+    "pd-split-request-optimal_decoder_best.csv",
+    "pd-split-request-optimal_prefill_best.csv",
+)
+
+# 候选文件名 -> 优先级（数值越小越优先）
+TARGET_PRIORITY = {
+    name: rank
+    for rank, name in enumerate(name for target in TARGET_FILES for name in (target, f"{target}.gz"))
+}
+
 # ==================== CSV解析 ====================
-def parse_transposed_csv(csv_file, logger):
+def parse_transposed_csv(csv_file, logger, needed_fields=None):
     """
     解析转置格式的CSV文件（支持gzip压缩）
     
     Args:
         csv_file: CSV文件路径
         logger: 日志对象
+        needed_fields: 只保留的字段名集合，None 表示保留所有字段
     
     Returns:
         dict: 解析后的数据，结构为 {field_name: [values]}
@@ -37,21 +55,31 @@ def parse_transposed_csv(csv_file, logger):
     
     try:
         with opener(csv_file, mode, encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, [])
+            
+            # 列位置只在表头上解析一次：同名列取最后一列，run 列按列名排序
+            columns = {name: idx for idx, name in enumerate(header)}
+            field_idx = columns.get('field_name')
+            run_idx = [columns[name] for name in sorted(columns) if name.startswith('run_')]
             
-            for row in reader:
-                field_name = row.get('field_name', '')
-                
-                if not field_name:
-                    continue
-                
-                # 提取所有run的值
-                values = []
-                for key in sorted(row.keys()):
-                    if key.startswith('run_'):
-                        values.append(row[key])
-                
-                data[field_name] = values
+            if field_idx is not None:
+                width = len(header)
+                for row in reader:
+                    if not row:
+                        continue
+                    # 字段数不足的行按缺失值补齐
+                    if len(row) < width:
+                        row = row + [None] * (width - len(row))
+                    
+                    field_name = row[field_idx]
+                    if not field_name:
+                        continue
+                    if needed_fields is not None and field_name not in needed_fields:
+                        continue
+                    
+                    # 提取所有run的值
+                    data[field_name] = [row[idx] for idx in run_idx]
         
         logger.info(f"成功解析CSV文件: {csv_file}, 字段数: {len(data)}")
     
@@ -61,7 +89,63 @@ def parse_transposed_csv(csv_file, logger):
     
     return data
 
+# ==================== 结果文件查找 ====================
+def find_result_files(results_dir):
+    """
+    递归查找结果文件，每个目录取优先级最高的一个
+    
+    基于 os.scandir 单次遍历，目录项按文件名直接查优先级表；
+    遍历顺序与 os.walk 自顶向下一致，不进入符号链接目录
+    
+    Args:
+        results_dir: 结果目录
+    
+    Returns:
+        list: 结果文件路径列表
+    """
+    csv_files = []
+    stack = [results_dir]
+    
+    while stack:
+        current = stack.pop()
+        best = None
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                    rank = TARGET_PRIORITY.get(entry.name)
+                    if rank is not None and (best is None or rank < best[0]):
+                        best = (rank, os.path.join(current, entry.name))
+        except OSError:
+            continue
+        
+        if best:
+            csv_files.append(best[1])
+        # 逆序压栈，保证按目录项顺序深度优先遍历
+        stack.extend(reversed(subdirs))
+    
+    return csv_files
+
 # ==================== 参数值提取 ====================
+@lru_cache(maxsize=None)
+def _param_value_pattern(param_name):
+    """
+    编译匹配 "<param_name>_<值>" 的正则（每个参数名只编译一次）
+    
+    参数名须从文件名的某一段开头处匹配，值为其后紧跟的一段
+    
+    Args:
+        param_name: 参数名称，如 mem1_GiB
+    
+    Returns:
+        re.Pattern: 编译后的正则
+    """
+    return re.compile(rf'(?:^|_){re.escape(param_name)}_([^_]*)')
+
 def extract_param_value_from_filename(filename, param_name):
     """
     从文件名或目录名中提取单个参数值
@@ -76,37 +160,38 @@ def extract_param_value_from_filename(filename, param_name):
     # 移除扩展名
     name_without_ext = os.path.splitext(filename)[0]
     
-    parts = name_without_ext.split('_')
-    param_parts = param_name.split('_')
-    param_len = len(param_parts)
-    
-    for i in range(len(parts) - param_len):
-        if parts[i:i+param_len] == param_parts:
-            if i + param_len < len(parts):
-                return parts[i + param_len]
-    
-    return None
+    match = _param_value_pattern(param_name).search(name_without_ext)
+    return match.group(1) if match else None
 
-def extract_param_from_csv_data(csv_data, param_name):
+def param_field_names(param_name):
     """
-    从CSV数据中提取参数值
+    参数在CSV数据中可能对应的字段名（按查找优先级）
     
     Args:
-        csv_data: 解析后的CSV数据
         param_name: 参数名称
     
     Returns:
-        str or None: 参数值
+        list: 候选字段名列表
     """
     field_name = param_name.replace('_', '.')
-    
-    possible_names = [
+    return [
         field_name,
         param_name,
         field_name.split('.')[-1],
     ]
+
+def extract_param_from_csv_data(csv_data, param_name):
+    """
+    从CSV数据中提取参数值
+    
+    Args:
+        csv_data: 解析后的CSV数据
+        param_name: 参数名称
     
-    for name in possible_names:
+    Returns:
+        str or None: 参数值
+    """
+    for name in param_field_names(param_name):
         if name in csv_data:
             values = csv_data[name]
             if values and len(values) > 0:
@@ -149,8 +234,114 @@ def extract_multi_param_values(csv_file, param_names, logger):
     
     return result
 
+# ==================== 单文件处理 ====================
+class _LogBuffer:
+    """
+    暂存单个文件处理过程中的日志（子进程中无法使用调用方的 logger），
+    由主进程按文件顺序写入调用方的 logger
+    """
+    
+    def __init__(self):
+        self.records = []
+    
+    def info(self, msg):
+        self.records.append((logging.INFO, msg))
+    
+    def warning(self, msg):
+        self.records.append((logging.WARNING, msg))
+    
+    def error(self, msg):
+        self.records.append((logging.ERROR, msg))
+
+def _process_one(csv_file, param_names, key_fields, needed_fields=None):
+    """
+    解析单个结果文件并构造汇总行（在子进程中执行）
+    
+    Args:
+        csv_file: CSV文件路径
+        param_names: 参数名称列表
+        key_fields: 需要提取的关键字段列表
+        needed_fields: 只解析的字段名集合，None 表示解析并输出所有字段
+    
+    Returns:
+        (dict or None, list): 结果行（无法提取参数或解析失败时为 None）与
+            处理过程中的日志 [(level, msg)]
+    """
+    logger = _LogBuffer()
+    return _build_row(csv_file, param_names, key_fields, needed_fields, logger), logger.records
+
+def _build_row(csv_file, param_names, key_fields, needed_fields, logger):
+    """解析单个结果文件并构造汇总行，日志写入 logger"""
+    try:
+        csv_data = parse_transposed_csv(csv_file, logger, needed_fields)
+        
+        # 提取参数值
+        param_values = extract_multi_param_values(csv_file, param_names, logger)
+        
+        # 检查是否所有参数都已提取
+        missing = [pn for pn in param_names if param_values.get(pn) is None]
+        if missing:
+            # 尝试从 CSV 数据中补充
+            for pn in missing:
+                val = extract_param_from_csv_data(csv_data, pn)
+                if val is not None:
+                    param_values[pn] = val
+            
+            # 再次检查
+            still_missing = [pn for pn in param_names if param_values.get(pn) is None]
+            if still_missing:
+                logger.warning(f"无法从 {csv_file} 提取参数 {still_missing}，跳过")
+                return None
+        
+        # 构造结果行
+        result_row = {'csv_file': csv_file}
+        
+        # 单参数时保持 param_value 列兼容
+        if len(param_names) == 1:
+            result_row['param_value'] = param_values[param_names[0]]
+        
+        # 多参数时每个参数一列
+        for pn in param_names:
+            result_row[pn] = param_values[pn]
+        
+        # 每个字段取第一个 run 的值，只遍历一次解析结果
+        first_values = {name: values[0] for name, values in csv_data.items() if values}
+        
+        # 提取关键字段（文件中没有的字段置空）
+        for field in key_fields:
+            if field in first_values:
+                result_row[field] = first_values[field]
+            elif field not in csv_data:
+                result_row[field] = None
+        
+        # 提取所有其他字段（只解析所需字段时不输出其他字段）
+        if needed_fields is None:
+            for field_name, value in first_values.items():
+                result_row.setdefault(field_name, value)
+        
+        return result_row
+    
+    except Exception as e:
+        logger.error(f"处理CSV文件失败: {csv_file}, 错误: {str(e)}")
+        return None
+
 # ==================== 结果分析 ====================
-def analyze_results(results_dir, param_names, output_file, key_fields, logger):
+def _sort_value(value):
+    """
+    参数值的排序键：可转为数值时按数值，否则按字符串
+    
+    Args:
+        value: 参数值
+    
+    Returns:
+        float or str: 排序键
+    """
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return str(value)
+
+def analyze_results(results_dir, param_names, output_file, key_fields, logger, extra_fields=True):
     """
     分析所有结果并生成汇总表格（支持多参数）
     
@@ -160,113 +351,64 @@ def analyze_results(results_dir, param_names, output_file, key_fields, logger):
         output_file: 输出文件路径
         key_fields: 需要提取的关键字段列表
         logger: 日志对象
+        extra_fields: 是否输出关键字段以外的所有字段；为 False 时
+            只解析关键字段和参数字段，结果文件字段很多时更快
     """
     logger.info(f"开始分析结果，目录: {results_dir}")
     logger.info(f"参数: {', '.join(param_names)}")
     
     # 扫描所有CSV文件
-    csv_files = []
-
-    TARGET_FILES = [
-        "pd-split-request-optimal_result_best.csv",
-        "pd-split-request-optimal_decoder_best.csv",
-        "pd-split-request-optimal_prefill_best.csv"
-    ]
-
-    for root, dirs, files in os.walk(results_dir):
-        target_found = None
-        for target in TARGET_FILES:
-            if target in files:
-                target_found = os.path.join(root, target)
-                break
-            elif f"{target}.gz" in files:
-                target_found = os.path.join(root, f"{target}.gz")
-                break
-        if target_found:
-            csv_files.append(target_found)
-        
+    csv_files = find_result_files(results_dir)
+    
     if not csv_files:
         logger.warning(f"在 {results_dir} 下未找到任何目标CSV文件")
         return
     
     logger.info(f"找到 {len(csv_files)} 个CSV文件")
     
-    # 解析所有CSV文件
-    all_results = []
+    # 各文件相互独立，多进程并行解析（结果顺序与文件顺序一致）
+    needed_fields = None
+    if not extra_fields:
+        needed_fields = set(key_fields)
+        for pn in param_names:
+            needed_fields.update(param_field_names(pn))
+    
+    worker = partial(_process_one, param_names=param_names, key_fields=key_fields,
+                     needed_fields=needed_fields)
+    max_workers = min(os.cpu_count() or 1, len(csv_files))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(worker, csv_files, chunksize=8))
+    else:
+        outcomes = [worker(csv_file) for csv_file in csv_files]
     
-    for csv_file in csv_files:
-        try:
-            csv_data = parse_transposed_csv(csv_file, logger)
-            
-            # 提取参数值
-            param_values = extract_multi_param_values(csv_file, param_names, logger)
-            
-            # 检查是否所有参数都已提取
-            missing = [pn for pn in param_names if param_values.get(pn) is None]
-            if missing:
-                # 尝试从 CSV 数据中补充
-                for pn in missing:
-                    val = extract_param_from_csv_data(csv_data, pn)
-                    if val is not None:
-                        param_values[pn] = val
-                
-                # 再次检查
-                still_missing = [pn for pn in param_names if param_values.get(pn) is None]
-                if still_missing:
-                    logger.warning(f"无法从 {csv_file} 提取参数 {still_missing}，跳过")
-                    continue
-            
-            # 构造结果行
-            result_row = {'csv_file': csv_file}
-            
-            # 单参数时保持 param_value 列兼容
-            if len(param_names) == 1:
-                result_row['param_value'] = param_values[param_names[0]]
-            
-            # 多参数时每个参数一列
-            for pn in param_names:
-                result_row[pn] = param_values[pn]
-            
-            # 提取关键字段
-            for field in key_fields:
-                if field in csv_data:
-                    values = csv_data[field]
-                    if values and len(values) > 0:
-                        result_row[field] = values[0]
-                else:
-                    result_row[field] = None
-            
-            # 提取所有其他字段
-            for field_name, values in csv_data.items():
-                if field_name not in result_row and values and len(values) > 0:
-                    result_row[field_name] = values[0]
-            
-            all_results.append(result_row)
-        
-        except Exception as e:
-            logger.error(f"处理CSV文件失败: {csv_file}, 错误: {str(e)}")
-            continue
+    # 各文件的日志（解析失败、参数缺失等）按文件顺序写入调用方的 logger
+    all_results = []
+    for row, records in outcomes:
+        for level, msg in records:
+            logger.log(level, msg)
+        if row is not None:
+            all_results.append(row)
     
     if not all_results:
         logger.warning("未提取到任何有效结果")
         return
     
     # 按参数值排序（多参数时按 param1 -> param2 排序）
-    def sort_key(row):
-        keys = []
-        for pn in param_names:
-            v = row.get(pn, '')
-            try:
-                keys.append(float(v))
-            except (ValueError, TypeError):
-                keys.append(str(v))
-        return keys
+    # 单参数直接以标量为键、多参数用元组，排序可走 float/元组的快速比较路径
+    if len(param_names) == 1:
+        pn = param_names[0]
+        sort_key = lambda row: _sort_value(row.get(pn, ''))
+        str_key = lambda row: str(row.get(pn, ''))
+    else:
+        sort_key = lambda row: tuple(_sort_value(row.get(pn, '')) for pn in param_names)
+        str_key = lambda row: tuple(str(row.get(pn, '')) for pn in param_names)
     
     try:
         all_results.sort(key=sort_key)
     except TypeError:
         # 混合类型无法比较，按字符串排序
-        all_results.sort(key=lambda x: [str(x.get(pn, '')) for pn in param_names])
+        all_results.sort(key=str_key)
     
     # 生成汇总表格
     logger.info(f"生成汇总表格: {output_file}")
@@ -292,11 +434,12 @@ def analyze_results(results_dir, param_names, output_file, key_fields, logger):
     output_dir_path = os.path.dirname(output_file) if os.path.dirname(output_file) else '.'
     os.makedirs(output_dir_path, exist_ok=True)
     
-    # 写入汇总 CSV
+    # 写入汇总 CSV：按输出字段顺序直接取值成行后批量写入
+    # （output_fields 已覆盖所有键，无需 DictWriter 逐行校验多余字段；缺失字段写为空）
     with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=output_fields)
-        writer.writeheader()
-        writer.writerows(all_results)
+        writer = csv.writer(f)
+        writer.writerow(output_fields)
+        writer.writerows([row.get(field) for field in output_fields] for row in all_results)
     
     logger.info(f"汇总表格已生成: {output_file}, 共 {len(all_results)} 条记录")
     
@@ -349,7 +492,8 @@ def main():
             param_names=param_names,
             output_file=final_output_file,
             key_fields=analyze_config.get('key_fields', []),
-            logger=logger
+            logger=logger,
+            extra_fields=analyze_config.get('extra_fields', True)
         )
         
         logger.info("=" * 60)
@@ -6,10 +6,17 @@
 """
 
 import os
+import re
 import yaml
 import logging
+from functools import lru_cache
 from itertools import product
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML 未编译 libyaml 扩展时使用纯 Python 解析器
+    from yaml import SafeLoader as YamlLoader
+
 # ==================== 配置 ====================
 # YAML配置文件路径（相对于运行目录）
 CONFIG_YAML_PATH = "./automatic/config.yaml"
@@ -17,6 +24,10 @@ CONFIG_YAML_PATH = "./automatic/config.yaml"
 # 多参数目录/名称分隔符（双下划线）
 PARAM_SEPARATOR = "__"
 
+# 常见的纯 ASCII 整数/小数写法，命中时直接转换，不走 try/except
+_INT_RE = re.compile(r'[+-]?\d+\Z', re.ASCII)
+_FLOAT_RE = re.compile(r'[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?\Z', re.ASCII)
+
 # ==================== 日志设置 ====================
 def setup_logging(log_file=None):
     """
@@ -59,7 +70,7 @@ def load_yaml_config(config_file=None):
         raise FileNotFoundError(f"配置文件不存在: {config_file}")
     
     with open(config_file, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     
     return config
 
@@ -102,14 +113,45 @@ def format_value_for_filename(value):
         return '_'.join(valid_parts)
     elif isinstance(value, str) and value.startswith('['):
         # 字符串格式的列表，如 "[1,1]" 或 "[null, 50]"
-        inner = value.strip('[]')
-        parts = [p.strip() for p in inner.split(',')]
-        # 过滤掉 null/None 字符串
-        valid_parts = [p for p in parts if p.lower() != 'null' and p != 'None']
-        return '_'.join(valid_parts)
+        return _format_list_string(value)
     else:
         return str(value)
 
+@lru_cache(maxsize=4096)
+def _format_list_string(value):
+    """
+    格式化字符串形式的列表参数值（同一取值在目录名、系统名和各文件名中重复出现，缓存结果）
+    
+    Args:
+        value: 如 "[1,1]" 或 "[null, 50]"
+    
+    Returns:
+        str: 去掉 null/None 后以下划线连接的各元素
+    """
+    inner = value.strip('[]')
+    parts = [p.strip() for p in inner.split(',')]
+    # 过滤掉 null/None 字符串
+    valid_parts = [p for p in parts if p.lower() != 'null' and p != 'None']
+    return '_'.join(valid_parts)
+
+def _parse_scalar(text):
+    """将单个值字符串转换为 int / float，都不能转换时保持原样"""
+    if _INT_RE.match(text):
+        return int(text)
+    if _FLOAT_RE.match(text):
+        return float(text)
+    
+    # 其他写法（如 inf、1_000、全角数字）交给 int/float 判断
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
 def parse_csv_value(value_str):
     """
     解析 CSV 中的值字符串
@@ -133,35 +175,9 @@ def parse_csv_value(value_str):
         inner = value_str[1:-1]
         parts = [p.strip() for p in inner.split(',')]
         # 尝试转换为数值
-        result = []
-        for p in parts:
-            if p.lower() == 'null':
-                result.append(None)
-                continue
-                
-            try:
-                result.append(int(p))
-            except ValueError:
-                try:
-                    result.append(float(p))
-                except ValueError:
-                    result.append(p)
-        return result
-    
-    # 尝试转换为整数
-    try:
-        return int(value_str)
-    except ValueError:
-        pass
-    
-    # 尝试转换为浮点数
-    try:
-        return float(value_str)
-    except ValueError:
-        pass
+        return [None if p.lower() == 'null' else _parse_scalar(p) for p in parts]
     
-    # 保持原始字符串
-    return value_str
+    return _parse_scalar(value_str)
 
 # ==================== 多参数扫描工具 ====================
 def parse_scan_params(scan_config):
@@ -308,14 +324,12 @@ def extract_param_values_from_combo_dir(dir_name, param_names):
     for i, param_name in enumerate(param_names):
         if i < len(segments):
             segment = segments[i]
-            param_parts = param_name.split('_')
-            param_len = len(param_parts)
             
-            # 在 segment 中查找 param_name 前缀并提取后面的值
-            seg_parts = segment.split('_')
-            if len(seg_parts) > param_len and seg_parts[:param_len] == param_parts:
-                value_str = '_'.join(seg_parts[param_len:])
-                result[param_name] = value_str
+            # 在 segment 中查找 "param_name_" 前缀并提取后面的值
+            # （等价于按 '_' 拆分后逐段比较前缀，但无需拆分和重新拼接）
+            prefix = param_name + '_'
+            if segment.startswith(prefix):
+                result[param_name] = segment[len(prefix):]
             else:
                 # 回退：segment 整体作为值（兼容简单情况）
                 result[param_name] = segment
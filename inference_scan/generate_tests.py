@@ -7,10 +7,18 @@
 """
 
 import os
+import re
 import json
-import copy
+import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
 from common import (
     load_yaml_config, generate_param_name_from_path, format_value_for_filename,
     parse_scan_params, generate_param_combinations, build_combo_dir_name,
@@ -18,9 +26,15 @@ from common import (
     CONFIG_YAML_PATH
 )
 
+# runtime 中包含 output / sys_list 字段的部署模式
+DEPLOY_MODES = ('pd-split-request-optimal', 'pd-fusion')
+
 # ==================== 参数值生成 ====================
 def generate_arithmetic_values(start, end, step):
     """生成等差数列"""
+    # 整数参数直接用 range 生成（与逐项累加结果相同）
+    if all(isinstance(x, int) and not isinstance(x, bool) for x in (start, end, step)) and step > 0:
+        return list(range(start, end + 1, step))
     values = []
     current = start
     while current <= end:
@@ -74,17 +88,18 @@ def get_test_values(param_mode):
     return formatted_values
 
 # ==================== 参数路径解析 ====================
+@lru_cache(maxsize=None)
 def _tokenize_param_path(param_path):
     """
-    将参数路径字符串分词为 token 列表（字符串 key 或整数 index）
+    将参数路径字符串分词为 token 元组（字符串 key 或整数 index）
+    扫描过程中路径不变，按路径缓存分词结果，每个组合不再重复解析
     
     Examples:
-        "mem1.GiB" -> ["mem1", "GiB"]
-        "networks[0].bandwidth" -> ["networks", 0, "bandwidth"]
+        "mem1.GiB" -> ("mem1", "GiB")
+        "networks[0].bandwidth" -> ("networks", 0, "bandwidth")
         "pd-split-request-optimal.sequence_length_list[0][0]"
-            -> ["pd-split-request-optimal", "sequence_length_list", 0, 0]
+            -> ("pd-split-request-optimal", "sequence_length_list", 0, 0)
     """
-    import re
     tokens = []
     parts = param_path.split('.')
     for part in parts:
@@ -100,7 +115,7 @@ def _tokenize_param_path(param_path):
                     tokens.append(seg)
                 else:
                     tokens.append(int(seg))
-    return tokens
+    return tuple(tokens)
 
 def parse_param_path(config, param_path):
     """
@@ -142,6 +157,90 @@ def set_param_value(config, param_path, value):
 
     parent[last_key] = value
 
+def find_sys_ref_sites(runtime, base_sys_config_path):
+    """
+    找出 runtime 的 sys_list 中需要指向新系统配置的位置
+    二维 sys_list 的每一项都替换；一维 sys_list 只替换等于基础系统配置路径的项
+    
+    Args:
+        runtime: runtime 配置字典
+        base_sys_config_path: 基础系统配置路径
+    
+    Returns:
+        [(deploy_mode, j, k), ...]，一维 sys_list 的 k 为 None
+    """
+    sites = []
+    for deploy_mode in runtime.keys():
+        if deploy_mode in DEPLOY_MODES:
+            sys_list = runtime[deploy_mode].get('sys_list', [])
+            if isinstance(sys_list, list):
+                for j, sys_item in enumerate(sys_list):
+                    if isinstance(sys_item, list):
+                        sites.extend((deploy_mode, j, k) for k in range(len(sys_item)))
+                    elif sys_item == base_sys_config_path:
+                        sites.append((deploy_mode, j, None))
+    return sites
+
+def touches_sys_list(param_path):
+    """判断 runtime 参数路径是否可能改写 sys_list（整个部署模式或其 sys_list）"""
+    tokens = _tokenize_param_path(param_path)
+    return tokens[0] in DEPLOY_MODES and \
+        (len(tokens) == 1 or tokens[1] == 'sys_list')
+
+# ==================== 配置读写 ====================
+def load_json_text(text):
+    """
+    解析 JSON 文本，安装了 orjson 时优先使用
+    
+    Args:
+        text: JSON 文本
+    
+    Returns:
+        解析后的对象
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # NaN、超过 64 位的整数等 orjson 不支持的内容交给标准库
+    return json.loads(text)
+
+def has_non_finite(obj):
+    """判断数据中是否含 NaN / Infinity 浮点数（orjson 会把它们写成 null）"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(has_non_finite(v) for v in obj)
+    return False
+
+def write_json_file(item):
+    """
+    写入单个 JSON 配置文件（在线程池中执行）
+    
+    安装了 orjson 时用其序列化（2 空格缩进），否则使用标准库；均整体序列化后一次写入。
+    orjson 的输出与 json.dumps(indent=2) 语义等价，但格式不完全相同：
+    浮点数写法不同（如 1e-05 写作 0.00001、1e+16 写作 1e16）。
+    含 NaN / Infinity 时使用标准库，按原样写出 NaN / Infinity
+    
+    Args:
+        item: (文件路径, 配置字典)
+    """
+    path, data = item
+    if orjson is not None and not has_non_finite(data):
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            content = None
+        if content is not None:
+            with open(path, 'wb') as f:
+                f.write(content)
+            return
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, indent=2, ensure_ascii=False))
+
 # ==================== 主生成逻辑 ====================
 def generate():
     """主生成函数：支持 1~2 个参数的排列组合扫描"""
@@ -202,12 +301,13 @@ def generate():
     print(f"基础 Runtime: {base_runtime_path}")
     print(f"基础 SysConfig: {base_sys_config_path}")
     
-    # 读取基础配置
+    # 读取基础配置：保留原始文本，每个组合重新解析出独立副本（纯 JSON 数据，比 deepcopy 快）
     with open(base_runtime_path, 'r', encoding='utf-8') as f:
-        base_runtime = json.load(f)
+        base_runtime_text = f.read()
     
     with open(base_sys_config_path, 'r', encoding='utf-8') as f:
-        base_sys_config = json.load(f)
+        base_sys_config_text = f.read()
+    base_sys_config = load_json_text(base_sys_config_text)
     
     original_sys_name = base_sys_config.get('name', 'System')
     
@@ -222,27 +322,39 @@ def generate():
     param_in_sys = [t == 'sys' for t in param_targets]
     any_sys_param = any(param_in_sys)
     
+    base_runtime = load_json_text(base_runtime_text)
+    
+    # 设置 output 时各组合的 runtime 都与基础 runtime 相同，需更新的部署模式只确定一次
+    output_modes = [m for m in base_runtime if m in DEPLOY_MODES and isinstance(base_runtime[m], dict)]
+    
+    # sys_list 中需替换的位置在各组合间相同，只在基础 runtime 上查找一次；
+    # 若 runtime 扫描参数可能改写 sys_list，则仍逐个组合查找
+    sys_ref_sites = None
+    if any_sys_param and not any(
+            touches_sys_list(pp) for pp, in_sys in zip(param_paths, param_in_sys) if not in_sys):
+        sys_ref_sites = find_sys_ref_sites(base_runtime, base_sys_config_path)
+    
     commands = []
+    output_dirs = []  # 各组合的结果目录，循环结束后统一创建
+    pending_files = []  # 待写入的 (路径, 配置)，循环结束后并行写入
     
     for combo in combinations:
         # combo 是一个 tuple，长度 = n_params
         values_list = list(combo)
         
-        new_runtime = copy.deepcopy(base_runtime)
+        new_runtime = load_json_text(base_runtime_text)
         
         # 创建组合目录名
         sub_dir_name = build_combo_dir_name(param_names, values_list)
         specific_output_path = os.path.join(results_base_dir, sub_dir_name)
-        os.makedirs(specific_output_path, exist_ok=True)
+        output_dirs.append(specific_output_path)
         
         # 更新 runtime 中的 output 字段
-        for deploy_mode in new_runtime.keys():
-            if isinstance(new_runtime[deploy_mode], dict) and \
-               deploy_mode in ['pd-split-request-optimal', 'pd-fusion']:
-                new_runtime[deploy_mode]['output'] = specific_output_path
+        for deploy_mode in output_modes:
+            new_runtime[deploy_mode]['output'] = specific_output_path
         
         # 处理系统配置参数
-        new_sys_config = copy.deepcopy(base_sys_config) if any_sys_param else None
+        new_sys_config = load_json_text(base_sys_config_text) if any_sys_param else None
         
         for i in range(n_params):
             pp = param_paths[i]
@@ -268,26 +380,23 @@ def generate():
             
             sys_filename = build_combo_filename("sys", param_names, values_list, ".json")
             new_sys_path = os.path.join(config_subdir, sys_filename)
-            with open(new_sys_path, 'w', encoding='utf-8') as f:
-                json.dump(new_sys_config, f, indent=2, ensure_ascii=False)
+            pending_files.append((new_sys_path, new_sys_config))
             
             # 更新 runtime 中的 sys_list 引用
-            for deploy_mode in new_runtime.keys():
-                if deploy_mode in ['pd-split-request-optimal', 'pd-fusion']:
-                    sys_list = new_runtime[deploy_mode].get('sys_list', [])
-                    if isinstance(sys_list, list):
-                        for j, sys_item in enumerate(sys_list):
-                            if isinstance(sys_item, list):
-                                for k, sys_path in enumerate(sys_item):
-                                    sys_list[j][k] = new_sys_path
-                            elif sys_item == base_sys_config_path:
-                                sys_list[j] = new_sys_path
+            sites = sys_ref_sites
+            if sites is None:
+                sites = find_sys_ref_sites(new_runtime, base_sys_config_path)
+            for deploy_mode, j, k in sites:
+                sys_list = new_runtime[deploy_mode]['sys_list']
+                if k is None:
+                    sys_list[j] = new_sys_path
+                else:
+                    sys_list[j][k] = new_sys_path
         
         # 保存 runtime 配置
         runtime_filename = build_combo_filename("runtime", param_names, values_list, ".json")
         runtime_path = os.path.join(config_subdir, runtime_filename)
-        with open(runtime_path, 'w', encoding='utf-8') as f:
-            json.dump(new_runtime, f, indent=2, ensure_ascii=False)
+        pending_files.append((runtime_path, new_runtime))
         
         # 生成运行命令
         cmd = f"{command_template} {runtime_path}"
@@ -295,19 +404,34 @@ def generate():
         
         print(f"  生成: {runtime_filename}")
     
-    # 写入 run_simulations.sh
+    # 结果目录都是 results_base_dir 的直接子目录：逐个 mkdir，已存在则跳过，
+    # 省去 os.makedirs 每次逐级检查父目录的系统调用
+    for path in dict.fromkeys(output_dirs):
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass
+    
+    # 各配置文件相互独立，并行写入
+    if pending_files:
+        with ThreadPoolExecutor(max_workers=min(8, len(pending_files))) as executor:
+            list(executor.map(write_json_file, pending_files))
+    
+    # 写入 run_simulations.sh：先拼出完整内容，再一次写入
+    header = [
+        "#!/bin/bash",
+        "# 自动生成的推理仿真脚本",
+        f"# Runtime: {runtime_prefix}",
+    ]
+    for i, pp in enumerate(param_paths):
+        header.append(f"# 参数{i+1}: {pp} ({len(all_values[i])} 个值)")
+    total_line = f"# 共 {len(commands)} 个测试"
+    if n_params > 1:
+        total_line += f" ({' × '.join(str(len(v)) for v in all_values)})"
+    header.append(total_line)
+    content = "\n".join(header) + "\n\n" + "".join(cmd + "\n" for cmd in commands)
     with open(commands_file, 'w', encoding='utf-8', newline='\n') as f:
-        f.write("#!/bin/bash\n")
-        f.write(f"# 自动生成的推理仿真脚本\n")
-        f.write(f"# Runtime: {runtime_prefix}\n")
-        for i, pp in enumerate(param_paths):
-            f.write(f"# 参数{i+1}: {pp} ({len(all_values[i])} 个值)\n")
-        f.write(f"# 共 {len(commands)} 个测试")
-        if n_params > 1:
-            f.write(f" ({' × '.join(str(len(v)) for v in all_values)})")
-        f.write("\n\n")
-        for cmd in commands:
-            f.write(cmd + "\n")
+        f.write(content)
     
     print("-" * 50)
     print(f"配置文件目录: {config_subdir}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合并数据缓存（input.cache）的回归测试
+
+运行方式（仓库根目录）：python -m unittest discover -s tests
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+import yaml
+
+from test_utils_csv import REPO_ROOT, load_utils
+
+# 表头含重复列名的标准格式文件
+DUPLICATE_COLUMNS_CSV = (
+    "model_x,batch,tps,tps\n"
+    "deepseek-v3,1,1.5,1.6\n"
+    "qwen3-32B,2,2.5,2.6\n"
+)
+
+# 多个文件：含缺失单元格、列不完全相同、宽格式，合并后各列都有缺失值
+MIXED_CSVS = {
+    'a.csv': (
+        "decoder_system_name,model_name,seq_size,tps\n"
+        "s1,m1,1024,1.5\n"
+        "s2,m2,,2.5\n"
+        ",m1,2048,\n"
+    ),
+    'b.csv': (
+        "decoder_system_name,model_name,extra\n"
+        "s1,m3,x\n"
+        "s2,m3,\n"
+    ),
+    'c.csv': (
+        "field_name,run_0,run_1\n"
+        "model_name,m4,m5\n"
+        "decoder_system_name,s1,\n"
+        "seq_size,1,2\n"
+    ),
+}
+
+
+def load_integration(package_dir: str, module_name: str):
+    """
+    按文件路径加载整合模块，其 `from utils import ...` 绑定到同目录的 utils.py
+
+    Returns:
+        (整合模块, utils 模块)
+    """
+    utils = load_utils(package_dir)
+    path = os.path.join(REPO_ROOT, package_dir, f'{module_name}.py')
+    spec = importlib.util.spec_from_file_location(f'{package_dir}_{module_name}', path)
+    module = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(sys.modules, {'utils': utils}):
+        spec.loader.exec_module(module)
+    return module, utils
+
+
+class DataCacheTest(unittest.TestCase):
+    """缓存只是加速手段：无法写入时不影响加载，命中时结果与首次加载一致"""
+
+    package_dir = 'inference_integration'
+    module_name = 'inference_integration'
+    class_name = 'InferenceDataIntegration'
+
+    def setUp(self):
+        module, self.utils = load_integration(self.package_dir, self.module_name)
+        self.integration_cls = getattr(module, self.class_name)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.tmp_dir, 'raw')
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache', 'data_integration')
+        os.makedirs(self.source_dir)
+        self.config_path = os.path.join(self.tmp_dir, 'config.yaml')
+        config = {'input': {'source_dir': self.source_dir, 'file_pattern': '*.csv', 'cache': True}}
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(config, f)
+        # 缓存写到测试目录，不碰真实的缓存目录
+        patcher = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': os.path.join(self.tmp_dir, 'cache')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_csv(self, name: str, content: str):
+        with open(os.path.join(self.source_dir, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def load(self) -> pd.DataFrame:
+        with mock.patch('builtins.print') as mocked_print:
+            df = self.integration_cls(self.config_path).load_data()
+        self.from_cache = any('从缓存加载' in str(c.args[0]) for c in mocked_print.call_args_list)
+        return df
+
+    def test_duplicate_column_names_skip_cache(self):
+        self.write_csv('dup.csv', DUPLICATE_COLUMNS_CSV)
+        df = self.load()
+        self.assertEqual(len(df), 2)
+        self.assertFalse(self.from_cache)
+        self.assertEqual(list(df.columns), ['model_x', 'batch', 'tps', 'tps', '_source_file'])
+        self.assertFalse(os.listdir(self.cache_dir))
+        # 再次加载同样不受影响
+        pd.testing.assert_frame_equal(self.load(), df)
+
+    def test_warm_load_matches_cold_load(self):
+        for name, content in MIXED_CSVS.items():
+            self.write_csv(name, content)
+        cold = self.load()
+        self.assertFalse(self.from_cache)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        warm = self.load()
+        self.assertTrue(self.from_cache)
+        pd.testing.assert_frame_equal(warm, cold)
+        # 缺失值与首次加载一致（均为 NaN，而不是 Parquet 读回的 None）
+        for column in cold.columns:
+            self.assertEqual(
+                [type(v) for v in warm[column].tolist()], [type(v) for v in cold[column].tolist()], column
+            )
+
+    @unittest.skipUnless(hasattr(os, 'getuid'), '仅适用于 POSIX 权限')
+    def test_cache_dir_private(self):
+        self.write_csv('a.csv', MIXED_CSVS['a.csv'])
+        self.load()
+        self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+        # 其他用户可访问的目录不使用缓存
+        shutil.rmtree(self.cache_dir)
+        os.makedirs(self.cache_dir)
+        os.chmod(self.cache_dir, 0o777)
+        self.load()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+class TrainingDataCacheTest(DataCacheTest):
+    package_dir = 'training_integration'
+    module_name = 'training_integration'
+    class_name = 'TrainingDataIntegration'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+utils.py 中多文件合并（concat_frames）的回归测试
+
+运行方式（仓库根目录）：python -m unittest discover -s tests
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from test_utils_csv import load_utils
+
+
+def category(values: list, categories: list = None) -> pd.Series:
+    return pd.Series(pd.Categorical(values, categories=categories))
+
+
+class ConcatFramesTest(unittest.TestCase):
+    """concat_frames 与 pd.concat(ignore_index=True) 取值一致，并尽量保留 category 列"""
+
+    package_dir = 'training_integration'
+
+    def setUp(self):
+        self.utils = load_utils(self.package_dir)
+
+    def assert_same_values(self, result: pd.DataFrame, expected: pd.DataFrame):
+        """列顺序、索引与取值一致（category 与 object 列按取值比较）"""
+        pd.testing.assert_frame_equal(result.astype(object), expected.astype(object))
+
+    def test_shared_categories(self):
+        frames = [
+            pd.DataFrame({'model': category(['a', 'b'], ['a', 'b']), 'tps': [1.0, 2.0]}),
+            pd.DataFrame({'model': category(['b', None], ['a', 'b']), 'tps': [3.0, 4.0]}),
+        ]
+        result = self.utils.concat_frames(frames)
+        pd.testing.assert_frame_equal(result, pd.concat(frames, ignore_index=True))
+
+    def test_disjoint_categories_keep_category(self):
+        frames = [
+            pd.DataFrame({'model': category(['b', 'a', None]), 'tps': [1.0, 2.0, 3.0]}),
+            pd.DataFrame({'model': category(['d', 'c']), 'tps': [4.0, 5.0]}),
+            pd.DataFrame({'model': category(['a', 'c', 'e']), 'tps': [6.0, 7.0, 8.0]}),
+        ]
+        result = self.utils.concat_frames(frames)
+        expected = pd.concat(frames, ignore_index=True)
+        # pd.concat 在类别不一致时退化为 object（pandas 3 为 str）
+        self.assertNotIsInstance(expected['model'].dtype, pd.CategoricalDtype)
+        self.assertIsInstance(result['model'].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(result['model'].cat.categories), ['a', 'b', 'c', 'd', 'e'])
+        self.assert_same_values(result, expected)
+
+    def test_category_in_one_object_in_another(self):
+        frames = [
+            pd.DataFrame({'tps': [1.0, 2.0], 'model': category(['a', 'b'])}),
+            pd.DataFrame({'tps': [3.0, 4.0], 'model': pd.Series(['c', None], dtype=object)}),
+        ]
+        result = self.utils.concat_frames(frames)
+        pd.testing.assert_frame_equal(result, pd.concat(frames, ignore_index=True))
+
+    def test_missing_columns(self):
+        frames = [
+            pd.DataFrame({'model': category(['a', 'b']), 'system': category(['s1', 's1']), 'tps': [1.0, 2.0]}),
+            pd.DataFrame({'model': category(['c']), 'extra': ['x'], 'tps': [3.0]}),
+            pd.DataFrame({'batch': [8, 16], 'model': category(['a', 'd'])}),
+        ]
+        result = self.utils.concat_frames(frames)
+        expected = pd.concat(frames, ignore_index=True)
+        self.assertEqual(list(result.columns), list(expected.columns))
+        self.assertIsInstance(result['model'].dtype, pd.CategoricalDtype)
+        # 只在部分文件中出现的 category 列与 pd.concat 结果相同
+        pd.testing.assert_series_equal(result['system'], expected['system'])
+        pd.testing.assert_series_equal(result['batch'], expected['batch'])
+        self.assert_same_values(result, expected)
+
+    def test_non_default_index(self):
+        frames = [
+            pd.DataFrame({'model': category(['a', 'b']), 'tps': [1.0, 2.0]}, index=[5, 7]),
+            pd.DataFrame({'model': category(['c']), 'tps': [np.nan]}, index=[5]),
+        ]
+        result = self.utils.concat_frames(frames)
+        self.assertTrue(result.index.equals(pd.RangeIndex(3)))
+        self.assert_same_values(result, pd.concat(frames, ignore_index=True))
+
+
+class ConcatFramesInferenceTest(ConcatFramesTest):
+    package_dir = 'inference_integration'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+utils.py 中 CSV 读取的回归测试
+
+运行方式（仓库根目录）：python -m unittest discover -s tests
+"""
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 日期、时间、日期时间列：pandas read_csv 均保留为原文本
+DATE_CSV = (
+    "model_name,run_date,start_time,finished_at,throughput\n"
+    "deepseek-v3,2024-01-03,12:30:00,2024-01-03 10:00:00,1.5\n"
+    "qwen3-32B,2024-01-04,13:45:00,2024-01-04 11:30:00,2.5\n"
+)
+
+
+def load_utils(package_dir: str):
+    """按文件路径加载指定目录下的 utils.py（两份副本模块名相同，不能直接 import）"""
+    path = os.path.join(REPO_ROOT, package_dir, 'utils.py')
+    spec = importlib.util.spec_from_file_location(f'{package_dir}_utils', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SmartReadCsvDateColumnTest(unittest.TestCase):
+    """日期/时间列经 pyarrow 读取后仍应是原文本，与 pd.read_csv 一致"""
+
+    package_dir = 'training_integration'
+
+    def setUp(self):
+        self.utils = load_utils(self.package_dir)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, 'dates.csv')
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write(DATE_CSV)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_smart_read_csv_keeps_date_text(self):
+        df = self.utils.smart_read_csv(self.csv_path)
+        expected = pd.read_csv(self.csv_path)
+        pd.testing.assert_frame_equal(df, expected)
+        self.assertEqual(df.loc[0, 'run_date'], '2024-01-03')
+        self.assertEqual(df.loc[0, 'start_time'], '12:30:00')
+        self.assertEqual(df.loc[0, 'finished_at'], '2024-01-03 10:00:00')
+
+    def test_read_csv_table_keeps_date_text(self):
+        if self.utils.pa is None:
+            self.skipTest('未安装 pyarrow')
+        table = self.utils.read_csv_table(self.csv_path)
+        self.assertIsNotNone(table)
+        df = self.utils.tables_to_frame([table, table], ['a.csv', 'b.csv'])
+        self.assertIsNotNone(df)
+        self.assertEqual(list(df['run_date'].astype(str)), ['2024-01-03', '2024-01-04'] * 2)
+        self.assertEqual(list(df['start_time'].astype(str)), ['12:30:00', '13:45:00'] * 2)
+        self.assertEqual(df['finished_at'].astype(str).iloc[0], '2024-01-03 10:00:00')
+
+
+class SmartReadCsvDateColumnInferenceTest(SmartReadCsvDateColumnTest):
+    package_dir = 'inference_integration'
+
+
+if __name__ == '__main__':
+    unittest.main()
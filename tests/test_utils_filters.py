@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+utils.py 中过滤条件（compile_filters）的回归测试
+
+运行方式（仓库根目录）：python -m unittest discover -s tests
+"""
+
+import operator
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from test_utils_csv import load_utils
+
+# 数值范围过滤的文本取值：含整数、小数、无法解析的文本与缺失值
+TEXT_VALUES = ['10', '9', 'abc', None, '2.5', '100']
+
+
+def expected_rows(values, op, threshold) -> list:
+    """参考结果：按 pd.to_numeric(errors='coerce') 解析后比较，无法解析与缺失的值不满足条件"""
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').astype(np.float64)
+    return list(np.flatnonzero(op(numbers, threshold).to_numpy()))
+
+
+class CompileFiltersTest(unittest.TestCase):
+    """数值范围比较按数值而不是按字符串比较"""
+
+    package_dir = 'training_integration'
+
+    def setUp(self):
+        self.utils = load_utils(self.package_dir)
+
+    def apply(self, df: pd.DataFrame, filters: list) -> pd.DataFrame:
+        return self.utils.compile_filters(filters)(df)
+
+    def assert_range_filters(self, column: pd.Series, values: list):
+        df = pd.DataFrame({'seq_size': column, 'row': np.arange(len(column))})
+        for name, op, threshold in [('>', operator.gt, 9), ('<=', operator.le, 9),
+                                    ('>=', operator.ge, 2.5), ('<', operator.lt, 10)]:
+            with self.subTest(operator=name):
+                result = self.apply(df, [{'field': 'seq_size', 'operator': name, 'values': [threshold]}])
+                self.assertEqual(list(result['row']), expected_rows(values, op, threshold))
+                # 仅用于比较，不改写原列
+                self.assertEqual(result['seq_size'].dtype, column.dtype)
+
+    def test_object_text_column(self):
+        self.assert_range_filters(pd.Series(TEXT_VALUES, dtype=object), TEXT_VALUES)
+
+    def test_string_dtype_column(self):
+        self.assert_range_filters(pd.Series(TEXT_VALUES, dtype='string'), TEXT_VALUES)
+
+    def test_category_column(self):
+        self.assert_range_filters(pd.Series(TEXT_VALUES, dtype='category'), TEXT_VALUES)
+
+    def test_nullable_int_column(self):
+        values = [10, 9, None, 2, 100]
+        self.assert_range_filters(pd.Series(values, dtype='Int64'), values)
+
+    def test_filter_removes_every_row(self):
+        df = pd.DataFrame({
+            'model_name': pd.Series(['a', 'b', 'a'], dtype='category'),
+            'seq_size': ['1024', '2048', '4096'],
+        })
+        result = self.apply(df, [
+            {'field': 'model_name', 'operator': '==', 'values': ['a']},
+            {'field': 'seq_size', 'operator': '>', 'values': [8192]},
+        ])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(list(result.columns), list(df.columns))
+        pd.testing.assert_series_equal(result.dtypes, df.dtypes)
+
+    def test_combined_with_equality(self):
+        df = pd.DataFrame({
+            'model_name': pd.Series(['a', 'b', 'a', 'a'], dtype='category'),
+            'seq_size': ['1024', '2048', '512', 'n/a'],
+        })
+        result = self.apply(df, [
+            {'field': 'model_name', 'operator': '==', 'values': ['a']},
+            {'field': 'seq_size', 'operator': '<=', 'values': [1024]},
+        ])
+        self.assertEqual(list(result.index), [0, 2])
+
+
+class CompileFiltersInferenceTest(CompileFiltersTest):
+    package_dir = 'inference_integration'
+
+
+if __name__ == '__main__':
+    unittest.main()
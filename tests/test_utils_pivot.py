@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+utils.py 中键编码与透视（factorize_keys / pivot_first_blocks）的回归测试
+
+结果与 pandas 的 pivot_table(aggfunc='first') / groupby().first() 逐块透视后 concat(axis=1) 对比
+
+运行方式（仓库根目录）：python -m unittest discover -s tests
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from test_utils_csv import load_utils
+
+
+def expected_pivot(df: pd.DataFrame, row_fields: list, specs: list, descending: bool = False) -> pd.DataFrame:
+    """pandas 参考实现：specs 为 [(name, value_field, col_fields)]，col_fields 为空时按行键取第一个值"""
+    pieces = []
+    for name, value_field, col_fields in specs:
+        if col_fields:
+            piece = df.pivot_table(
+                index=row_fields, columns=col_fields, values=value_field, aggfunc='first', observed=True
+            )
+            piece = piece.reindex(columns=sorted(piece.columns, reverse=descending))
+            piece.columns = pd.Index([(name, key) for key in piece.columns], tupleize_cols=False)
+        else:
+            piece = df.groupby(row_fields, observed=True)[value_field].first().to_frame(name)
+        pieces.append(piece)
+    return pd.concat(pieces, axis=1)
+
+
+class PivotFirstBlocksTest(unittest.TestCase):
+    """pivot_first_blocks 与 pandas 逐块透视结果一致"""
+
+    package_dir = 'training_integration'
+
+    def setUp(self):
+        self.utils = load_utils(self.package_dir)
+
+    def pivot(self, df: pd.DataFrame, row_fields: list, specs: list, descending: bool = False) -> pd.DataFrame:
+        row_keys = self.utils.factorize_keys(df, row_fields)
+        # 与透视调用方一致：相同列字段的各块共用一次列键编码
+        col_keys = {}
+        blocks = []
+        for name, value_field, col_fields in specs:
+            keys = None
+            if col_fields:
+                keys = col_keys.setdefault(tuple(col_fields), self.utils.factorize_keys(df, col_fields))
+            blocks.append((name, df[value_field], keys))
+        return self.utils.pivot_first_blocks(row_keys, blocks, descending=descending)
+
+    def assert_matches_pandas(self, df: pd.DataFrame, row_fields: list, specs: list, descending: bool = False):
+        result = self.pivot(df, row_fields, specs, descending)
+        expected = expected_pivot(df, row_fields, specs, descending)
+        pd.testing.assert_frame_equal(result, expected, check_index_type=False, check_column_type=False)
+
+    def test_nan_cells_take_first_valid_value(self):
+        df = pd.DataFrame({
+            'model': ['a', 'a', 'a', 'b', 'b', 'c'],
+            'limit': [50, 50, 100, 50, 100, 100],
+            'tps': [np.nan, 1.0, 2.0, np.nan, 4.0, np.nan],
+            'ttft': [0.5, np.nan, np.nan, 0.7, 0.8, 0.9],
+        })
+        specs = [('tps', 'tps', ['limit']), ('ttft', 'ttft', None)]
+        self.assert_matches_pandas(df, ['model'], specs)
+        self.assert_matches_pandas(df, ['model'], specs, descending=True)
+
+    def test_duplicate_keys_keep_first_value(self):
+        df = pd.DataFrame({
+            'model': ['b', 'a', 'b', 'a', 'b'],
+            'batch': [1, 1, 1, 2, 1],
+            'limit': [50, 50, 50, 50, 100],
+            'tps': [1.0, 2.0, 3.0, 4.0, 5.0],
+        })
+        self.assert_matches_pandas(df, ['model', 'batch'], [('tps', 'tps', ['limit'])], descending=True)
+        self.assert_matches_pandas(df, ['model', 'batch'], [('tps', 'tps', None)])
+
+    def test_missing_keys_are_dropped(self):
+        df = pd.DataFrame({
+            'model': ['a', None, 'b', 'b'],
+            'limit': [50.0, 50.0, np.nan, 100.0],
+            'tps': [1.0, 2.0, 3.0, 4.0],
+        })
+        self.assert_matches_pandas(df, ['model'], [('tps', 'tps', ['limit']), ('first', 'tps', None)])
+
+    def test_mixed_type_keys(self):
+        df = pd.DataFrame({
+            'model': pd.Categorical(['m2', 'm1', 'm2', 'm1']),
+            'batch': [8, 8, 16, 16],
+            'ratio': [0.5, 0.5, 1.5, 0.5],
+            'limit': ['fast', 'slow', 'fast', 'slow'],
+            'tps': [1.0, 2.0, 3.0, 4.0],
+        })
+        specs = [('tps', 'tps', ['limit', 'batch']), ('ratio_first', 'tps', None)]
+        self.assert_matches_pandas(df, ['model', 'ratio'], specs)
+        self.assert_matches_pandas(df, ['model', 'ratio'], specs, descending=True)
+
+    def test_row_order_follows_blocks(self):
+        # 第一块只有 b 行有值，a 行由第二块追加，顺序与 concat(axis=1) 的索引并集一致
+        df = pd.DataFrame({
+            'model': ['a', 'b', 'a', 'b'],
+            'limit': [50, 50, 100, 100],
+            'tps': [np.nan, 1.0, np.nan, 2.0],
+            'ttft': [3.0, 4.0, 5.0, 6.0],
+        })
+        specs = [('tps', 'tps', ['limit']), ('ttft', 'ttft', ['limit'])]
+        self.assert_matches_pandas(df, ['model'], specs)
+
+    def test_integer_single_column_keeps_dtype(self):
+        df = pd.DataFrame({'model': ['b', 'a', 'b'], 'count': [1, 2, 3]})
+        result = self.pivot(df, ['model'], [('count', 'count', None)])
+        self.assertEqual(result['count'].dtype, np.int64)
+        self.assert_matches_pandas(df, ['model'], [('count', 'count', None)])
+
+    def test_empty_input(self):
+        df = pd.DataFrame({
+            'model': pd.Series([], dtype=object),
+            'limit': pd.Series([], dtype=np.int64),
+            'tps': pd.Series([], dtype=np.float64),
+        })
+        result = self.pivot(df, ['model'], [('tps', 'tps', ['limit']), ('first', 'tps', None)])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(list(result.columns), ['first'])
+
+    def test_no_blocks(self):
+        df = pd.DataFrame({'model': ['a'], 'tps': [1.0]})
+        with self.assertRaises(ValueError):
+            self.pivot(df, ['model'], [])
+
+
+class PivotFirstBlocksInferenceTest(PivotFirstBlocksTest):
+    package_dir = 'inference_integration'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,15 +10,29 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 
 from utils import (
     load_config,
+    copy_on_write,
     smart_read_csv,
     ensure_dir,
     find_files,
-    apply_filters,
-    format_output_filename
+    compile_filters,
+    categorize_strings,
+    concat_frames,
+    coerce_numeric,
+    downcast_numeric,
+    round_numeric,
+    read_csv_table,
+    tables_to_frame,
+    inputs_fingerprint,
+    read_data_cache,
+    write_data_cache,
+    format_output_filename,
+    apply_output_format,
+    export_dataframe
 )
 
 
@@ -35,6 +49,10 @@ class TrainingDataIntegration:
         self.config = load_config(config_path)
         self.data: Optional[pd.DataFrame] = None
         
+        # 配置在处理过程中不变：字段列表与过滤函数只解析一次
+        self._numeric_fields = self._get_numeric_fields()
+        self._filter_fn = compile_filters(self.config.get('filters', []))
+        
     def load_data(self) -> pd.DataFrame:
         """
         加载并合并所有输入数据
@@ -50,9 +68,7 @@ class TrainingDataIntegration:
         single_file = input_config.get('single_file')
         if single_file and os.path.exists(single_file):
             print(f"正在加载单个文件: {single_file}")
-            df = self._load_single_file(single_file)
-            df['_source_file'] = os.path.basename(single_file)
-            self.data = df
+            self.data = self._load_source_file(single_file)
             return self.data
         
         # 扫描目录下的文件
@@ -66,25 +82,100 @@ class TrainingDataIntegration:
         
         print(f"找到 {len(files)} 个文件")
         
+        # 输入文件及逐文件取行配置未变化时直接读取上次合并结果的缓存
+        analysis_config = self.config.get('analysis', {})
+        top_n = analysis_config.get('top_n_per_file')
+        fingerprint = None
+        if input_config.get('cache', True):
+            fingerprint = inputs_fingerprint(
+                files, top_n, analysis_config.get('sort_by'), analysis_config.get('sort_order')
+            )
+            cached = read_data_cache(fingerprint)
+            if cached is not None:
+                self.data = cached
+                print(f"输入文件未变化，从缓存加载 {len(self.data)} 条记录")
+                return self.data
+        
+        # 未配置逐文件 top_n 时，优先在 Arrow 层合并所有文件，只转换一次 DataFrame
+        if not (top_n and top_n > 0):
+            df = self._load_tables(files)
+            if df is not None:
+                self.data = df
+                print(f"总计加载 {len(self.data)} 条记录")
+                if fingerprint:
+                    write_data_cache(self.data, fingerprint)
+                return self.data
+        
+        # 多线程并发读取（CSV 解析在 C 层释放 GIL），结果按文件顺序收集
         all_data = []
-        for file_path in files:
-            try:
-                df = self._load_single_file(file_path)
-                # 添加源文件信息
-                df['_source_file'] = os.path.basename(file_path)
-                all_data.append(df)
-                print(f"  ✓ 已加载: {os.path.basename(file_path)} ({len(df)} 行)")
-            except Exception as e:
-                print(f"  ✗ 加载失败: {os.path.basename(file_path)} - {e}")
+        with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+            futures = [executor.submit(self._load_source_file, p) for p in files]
+            for file_path, future in zip(files, futures):
+                try:
+                    df = future.result()
+                    all_data.append(df)
+                    print(f"  ✓ 已加载: {os.path.basename(file_path)} ({len(df)} 行)")
+                except Exception as e:
+                    print(f"  ✗ 加载失败: {os.path.basename(file_path)} - {e}")
         
         if not all_data:
             raise ValueError("没有成功加载任何数据")
         
-        self.data = pd.concat(all_data, ignore_index=True)
+        if len(all_data) == 1:
+            # 单个文件无需 concat，避免整表复制；仅在索引不连续时重建索引
+            df = all_data[0]
+            self.data = df if df.index.equals(pd.RangeIndex(len(df))) else df.reset_index(drop=True)
+        else:
+            self.data = concat_frames(all_data)
         print(f"总计加载 {len(self.data)} 条记录")
         
+        if fingerprint:
+            write_data_cache(self.data, fingerprint)
+        
         return self.data
     
+    def _load_tables(self, files: List[str]) -> Optional[pd.DataFrame]:
+        """
+        以 pyarrow Table 形式并发读取所有文件，在 Arrow 层合并后一次性转换为 DataFrame
+        
+        Args:
+            files: 文件路径列表
+            
+        Returns:
+            合并后的 DataFrame；任一文件无法由 pyarrow 解析时返回 None，由调用方回退到逐文件读取
+        """
+        with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+            tables = list(executor.map(read_csv_table, files))
+        
+        if any(table is None for table in tables):
+            return None
+        
+        names = [os.path.basename(p) for p in files]
+        df = tables_to_frame(tables, names)
+        if df is None:
+            return None
+        
+        for name, table in zip(names, tables):
+            print(f"  ✓ 已加载: {name} ({len(table)} 行)")
+        return df
+    
+    def _load_source_file(self, file_path: str) -> pd.DataFrame:
+        """
+        加载单个文件并添加源文件信息（在线程池中执行）
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            带 _source_file 列的 DataFrame
+        """
+        df = self._load_single_file(file_path)
+        # 整列只有一个取值，用 category 存储：一份字符串 + int8 编码
+        df['_source_file'] = pd.Categorical.from_codes(
+            np.zeros(len(df), dtype=np.int8), categories=[os.path.basename(file_path)]
+        )
+        return df
+    
     def _load_single_file(self, file_path: str) -> pd.DataFrame:
         """
         加载单个 CSV 文件
@@ -110,10 +201,17 @@ class TrainingDataIntegration:
             
             if sort_by in df.columns:
                 df[sort_by] = pd.to_numeric(df[sort_by], errors='coerce')
-                ascending = sort_order == 'ascending'
-                df = df.sort_values(sort_by, ascending=ascending).head(top_n)
-        
-        return df
+                # 部分选择前 N 行，无需整表排序
+                if sort_order == 'ascending':
+                    top = df.nsmallest(top_n, sort_by)
+                else:
+                    top = df.nlargest(top_n, sort_by)
+                # 与排序后取 head 一致：有效值不足 N 个时用空值行补足
+                if len(top) < top_n:
+                    top = pd.concat([top, df[df[sort_by].isna()].head(top_n - len(top))])
+                df = top
+        
+        return categorize_strings(df)
     
     def preprocess(self) -> pd.DataFrame:
         """
@@ -125,20 +223,26 @@ class TrainingDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
         
-        df = self.data.copy()
+        # 不做防御性复制：过滤会生成新对象，类型转换的结果本就要写回 self.data
+        df = self.data
         
         # 应用过滤器
         filters = self.config.get('filters', [])
         if filters:
             original_count = len(df)
-            df = apply_filters(df, filters)
+            df = self._filter_fn(df)
             print(f"过滤器应用: {original_count} -> {len(df)} 条记录")
         
         # 数值类型转换
-        numeric_fields = self._get_numeric_fields()
-        for field in numeric_fields:
-            if field in df.columns:
-                df[field] = pd.to_numeric(df[field], errors='coerce')
+        numeric_fields = self._numeric_fields
+        valid_fields = [f for f in dict.fromkeys(numeric_fields) if f in df.columns]
+        if valid_fields:
+            # 一次性批量转换，无法解析的值置为 NaN
+            df[valid_fields] = df[valid_fields].apply(coerce_numeric)
+        
+        # 数值列降精度（float32 需在 analysis.numeric_precision 中显式开启）
+        precision = self.config.get('analysis', {}).get('numeric_precision', 'float64')
+        downcast_numeric(df, numeric_fields, precision)
         
         self.data = df
         return df
@@ -166,7 +270,7 @@ class TrainingDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
         
-        df = self.data.copy()
+        df = self.data
         
         # 选择要输出的字段
         output_fields = []
@@ -201,7 +305,8 @@ class TrainingDataIntegration:
         if not output_fields:
             output_fields = list(df.columns)
         
-        result = df[output_fields].copy()
+        # loc 按列选取即返回独立的新对象，无需再 copy
+        result = df.loc[:, output_fields]
         
         # 排序
         analysis_config = self.config.get('analysis', {})
@@ -214,8 +319,7 @@ class TrainingDataIntegration:
         
         # 四舍五入
         decimal_places = analysis_config.get('decimal_places', 4)
-        numeric_cols = result.select_dtypes(include=[np.number]).columns
-        result[numeric_cols] = result[numeric_cols].round(decimal_places)
+        round_numeric(result, decimal_places)
         
         # 重命名列（使用别名）
         rename_map = {}
@@ -245,7 +349,7 @@ class TrainingDataIntegration:
         if self.data is None:
             raise ValueError("请先调用 load_data() 加载数据")
         
-        df = self.data.copy()
+        df = self.data
         iv_config = self.config.get('independent_variables', {})
         analysis_config = self.config.get('analysis', {})
         
@@ -270,7 +374,7 @@ class TrainingDataIntegration:
             raise ValueError("没有找到有效的因变量字段")
         
         # 按行字段分组，取第一行的值
-        result = df.groupby(row_fields)[value_fields].first().reset_index()
+        result = df.groupby(row_fields, observed=True)[value_fields].first().reset_index()
         
         # 重命名列
         rename_map = {}
@@ -290,14 +394,13 @@ class TrainingDataIntegration:
         
         # 四舍五入
         decimal_places = analysis_config.get('decimal_places', 4)
-        numeric_cols = result.select_dtypes(include=[np.number]).columns
-        result[numeric_cols] = result[numeric_cols].round(decimal_places)
+        round_numeric(result, decimal_places)
         
         return result
     
     def export(self, df: pd.DataFrame, suffix: str = "") -> str:
         """
-        导出结果到 Excel
+        导出结果（Excel / Parquet / CSV，由 output.format 指定）
         
         Args:
             df: 要导出的 DataFrame
@@ -316,10 +419,11 @@ class TrainingDataIntegration:
         if suffix:
             name, ext = os.path.splitext(filename)
             filename = f"{name}_{suffix}{ext}"
+        filename = apply_output_format(filename, output_config.get('format', 'xlsx'))
         
         output_path = os.path.join(output_dir, filename)
         
-        df.to_excel(output_path, index=False)
+        export_dataframe(df, output_path)
         print(f"结果已导出: {output_path}")
         
         return output_path
@@ -377,8 +481,9 @@ def main():
         config_path = sys.argv[1]
     
     try:
-        processor = TrainingDataIntegration(config_path)
-        processor.run()
+        with copy_on_write():
+            processor = TrainingDataIntegration(config_path)
+            processor.run()
     except Exception as e:
         print(f"\n错误: {e}")
         sys.exit(1)
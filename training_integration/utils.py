@@ -4,11 +4,92 @@ Common utilities for data integration
 """
 
 import os
+import re
+import csv
+import codecs
+import contextlib
+import fnmatch
+import hashlib
+import json
+import math
+import operator as op
 import yaml
+import numpy as np
 import pandas as pd
+import datetime as dt
 from datetime import datetime
+from functools import reduce
 from glob import glob
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML 未编译 libyaml 扩展时使用纯 Python 解析器
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import parquet as pq
+except ImportError:  # pyarrow 为可选依赖，未安装时回退到 pandas 解析
+    pa = None
+    pa_csv = None
+    pq = None
+
+
+# 依次尝试的文件编码
+CSV_ENCODINGS = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'latin1']
+
+# 可解码范围被另一候选编码覆盖的编码：后者已解码失败时前者必然失败，不再整文件重试
+ENCODING_SUPERSETS = {'utf-8': 'utf-8-sig', 'gb2312': 'gbk'}
+
+# 与 pandas read_csv 默认一致的缺失值文本（pyarrow 解析与按行解析宽格式文件时使用）
+CSV_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+# 宽格式文件首列中的字段名标记
+WIDE_FORMAT_MARKERS = ('field_name', 'model_name')
+
+# 编码探测采样字节数
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+# 数据缓存目录（位于用户缓存目录 $XDG_CACHE_HOME 或 ~/.cache 下，仅当前用户可访问）
+DATA_CACHE_DIR_NAME = 'data_integration'
+
+# 数据缓存文件名前缀；加载逻辑变化导致缓存内容不再适用时递增版本号
+DATA_CACHE_PREFIX = 'di-cache-'
+DATA_CACHE_VERSION = 3
+
+# 数据缓存 Parquet 元数据中记录列索引名称的键（Parquet 本身不保存列索引名称）
+DATA_CACHE_COLUMNS_NAME_KEY = b'data_integration.columns_name'
+
+# 数据缓存保留时长（秒）：写入新缓存时删除超过该时长未更新的旧缓存文件
+DATA_CACHE_MAX_AGE = 7 * 24 * 3600
+
+# 支持的输出格式及对应的文件扩展名
+OUTPUT_FORMATS = {
+    'xlsx': '.xlsx',
+    'parquet': '.parquet',
+    'csv': '.csv',
+}
+
+# 比较操作符
+COMPARE_OPERATORS = {
+    '==': op.eq,
+    '!=': op.ne,
+    '>': op.gt,
+    '<': op.lt,
+    '>=': op.ge,
+    '<=': op.le,
+}
+
+# 数值范围比较合并为一个表达式，由 pd.eval 计算（安装 numexpr 时自动启用）
+NUMERIC_OPERATORS = ('>', '<', '>=', '<=')
+
+# 编码探测结果缓存：(绝对路径, mtime_ns, size) -> encoding
+_encoding_cache = {}
+
 
 def load_config(config_path: str) -> dict:
     """
@@ -24,15 +105,188 @@ def load_config(config_path: str) -> dict:
         raise FileNotFoundError(f"配置文件不存在: {config_path}")
     
     with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     
     return config
 
 
+def _first_csv_record(file_path: str, encoding: str) -> list:
+    """读取 CSV 的首条记录（表头或首行数据）"""
+    if encoding == 'utf-8':
+        encoding = 'utf-8-sig'
+    with open(file_path, 'r', encoding=encoding, errors='replace', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def _read_arrow_table(file_path: str, encoding: str, header, as_text: bool = False) -> 'pa.Table':
+    """
+    使用 pyarrow 多线程解析器读取 CSV 为 Arrow Table
+    
+    Args:
+        file_path: CSV 文件路径
+        encoding: 文件编码
+        header: None 表示无表头（自动生成列名），否则首行为表头
+        as_text: 是否所有列都按字符串读取（跳过类型推断）
+    
+    Returns:
+        pyarrow Table
+    """
+    column_types = {}
+    if as_text:
+        # 列类型按列名指定：无表头时列名为自动生成的 f0..fN
+        record = _first_csv_record(file_path, encoding)
+        names = [f'f{i}' for i in range(len(record))] if header is None else record
+        column_types = {name: pa.string() for name in names}
+    
+    # pyarrow 会自动跳过 UTF-8 BOM，utf-8-sig 直接按 utf8 解析，省去转码开销
+    if encoding in ('utf-8-sig', 'utf-8'):
+        encoding = 'utf8'
+    read_options = pa_csv.ReadOptions(
+        encoding=encoding,
+        use_threads=True,
+        autogenerate_column_names=header is None
+    )
+    # 与 pandas 保持一致：空字符串及 pandas 默认的缺失值文本（如 None、<NA>）视为缺失值
+    convert_options = pa_csv.ConvertOptions(
+        null_values=sorted(CSV_NA_VALUES), strings_can_be_null=True, column_types=column_types
+    )
+    
+    table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+    # 编码不匹配时 pyarrow 不会报错，而是把列推断为 binary，此处视为解码失败
+    if any(pa.types.is_binary(t) for t in table.schema.types):
+        raise UnicodeError(f"编码 {encoding} 无法解码文件: {file_path}")
+    
+    # pyarrow 会把日期、时间文本推断为 date/time/timestamp（timestamp_parsers=[] 也无法关闭），
+    # pandas read_csv 则保留原文本；这些列按字符串重新读取，保持与 pandas 一致
+    temporal = [field.name for field in table.schema if pa.types.is_temporal(field.type)]
+    if temporal:
+        column_types.update((name, pa.string()) for name in temporal)
+        convert_options = pa_csv.ConvertOptions(
+            null_values=sorted(CSV_NA_VALUES), strings_can_be_null=True, column_types=column_types
+        )
+        table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+    return table
+
+
+def _read_csv_arrow(file_path: str, encoding: str, header, as_text: bool = False) -> pd.DataFrame:
+    """
+    使用 pyarrow 多线程解析器读取 CSV，并零拷贝转换为 DataFrame
+    
+    Args:
+        file_path: CSV 文件路径
+        encoding: 文件编码
+        header: None 表示无表头（列名为 0..n-1），否则首行为表头
+        as_text: 是否所有列都按字符串读取
+    
+    Returns:
+        DataFrame
+    """
+    table = _read_arrow_table(file_path, encoding, header, as_text)
+    # 转换为 numpy 类型而非 ArrowDtype（dtype_backend='pyarrow'）：后续的数值转换、
+    # 降精度与透视均基于 numpy 类型，Arrow 类型经 to_numeric 会变成可空类型（pd.NA）
+    df = _none_to_nan(table.to_pandas(split_blocks=True, self_destruct=True))
+    
+    if header is None:
+        df.columns = range(len(df.columns))
+    return df
+
+
+def _none_to_nan(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    将 object 列中的缺失值统一为 NaN（原地修改）
+    
+    pyarrow 转换出的 object 列以 None 表示缺失值，pandas read_csv 则为 NaN
+    
+    Args:
+        df: pyarrow 转换得到的 DataFrame
+    
+    Returns:
+        转换后的 DataFrame
+    """
+    # 按位置遍历，兼容重复列名
+    for i, dtype in enumerate(df.dtypes):
+        if dtype != object:
+            continue
+        col = df.iloc[:, i]
+        mask = col.isna().to_numpy()
+        if mask.any():
+            values = col.to_numpy(dtype=object, copy=True)
+            values[mask] = np.nan
+            df.isetitem(i, values)
+    return df
+
+
+def _can_decode(head: bytes, encoding: str) -> bool:
+    """判断采样字节能否按指定编码解码（容忍末尾被截断的多字节字符）"""
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+
+def detect_encoding(file_path: str) -> str:
+    """
+    基于文件头部采样探测编码，结果按 (路径, mtime, size) 缓存
+    
+    Args:
+        file_path: 文件路径
+    
+    Returns:
+        编码名称
+    """
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    if cache_key in _encoding_cache:
+        return _encoding_cache[cache_key]
+    
+    with open(file_path, 'rb') as f:
+        head = f.read(ENCODING_SNIFF_BYTES)
+    
+    # 按候选顺序取第一个能解码采样的编码（与逐个整文件重试的优先级一致）
+    encoding = next((e for e in CSV_ENCODINGS if _can_decode(head, e)), 'latin1')
+    
+    _encoding_cache[cache_key] = encoding
+    return encoding
+
+
+def _encoding_candidates(detected: str) -> list:
+    """
+    按尝试顺序列出候选编码：探测结果在前，其余按 CSV_ENCODINGS 顺序
+    
+    只有前面的编码解码失败才会尝试后续编码，因此跳过可解码范围被前面编码覆盖的编码
+    （utf-8-sig 失败则 utf-8 必然失败，gbk 失败则 gb2312 必然失败），避免无意义的整文件重读
+    
+    Args:
+        detected: 探测到的编码
+    
+    Returns:
+        候选编码列表
+    """
+    candidates = [detected]
+    for encoding in CSV_ENCODINGS:
+        if encoding != detected and ENCODING_SUPERSETS.get(encoding) not in candidates:
+            candidates.append(encoding)
+    return candidates
+
+
+def _read_csv_with_encoding(file_path: str, encoding: str, use_arrow: bool, **kwargs) -> pd.DataFrame:
+    """按指定编码读取 CSV，pyarrow 解析失败时回退到 pandas"""
+    if use_arrow:
+        try:
+            return _read_csv_arrow(file_path, encoding, kwargs.get('header', 'infer'), kwargs.get('dtype') is str)
+        except pa.ArrowException:
+            pass
+    return pd.read_csv(file_path, encoding=encoding, **kwargs)
+
+
 def smart_read_csv(file_path: str, **kwargs) -> pd.DataFrame:
     """
     智能读取 CSV 文件，自动检测编码
     
+    先对文件头部采样探测编码，只解析一次；探测失误时再依次尝试其余候选编码。
+    安装了 pyarrow 时优先使用其多线程解析器，失败则回退到 pandas
+    
     Args:
         file_path: CSV 文件路径
         **kwargs: 传递给 pd.read_csv 的其他参数
@@ -40,11 +294,14 @@ def smart_read_csv(file_path: str, **kwargs) -> pd.DataFrame:
     Returns:
         DataFrame
     """
-    encodings = ['utf-8-sig', 'utf-8', 'gbk', 'gb2312', 'latin1']
+    # pyarrow 路径仅支持 header 与 dtype=str 参数，其余参数交给 pandas 处理
+    header = kwargs.get('header', 'infer')
+    use_arrow = (pa is not None and set(kwargs) <= {'header', 'dtype'}
+                 and header in (None, 0, 'infer') and kwargs.get('dtype', str) is str)
     
-    for encoding in encodings:
+    for encoding in _encoding_candidates(detect_encoding(file_path)):
         try:
-            return pd.read_csv(file_path, encoding=encoding, **kwargs)
+            return _read_csv_with_encoding(file_path, encoding, use_arrow, **kwargs)
         except (UnicodeDecodeError, UnicodeError):
             continue
     
@@ -52,6 +309,305 @@ def smart_read_csv(file_path: str, **kwargs) -> pd.DataFrame:
     return pd.read_csv(file_path, encoding='utf-8', errors='ignore', **kwargs)
 
 
+def read_csv_table(file_path: str):
+    """
+    读取带表头的标准 CSV 为 pyarrow Table（编码探测同 smart_read_csv）
+    
+    Args:
+        file_path: CSV 文件路径
+    
+    Returns:
+        pyarrow Table；未安装 pyarrow 或 pyarrow 无法解析时返回 None
+    """
+    if pa is None:
+        return None
+    
+    try:
+        detected = detect_encoding(file_path)
+    except OSError:
+        return None
+    
+    for encoding in _encoding_candidates(detected):
+        try:
+            return _read_arrow_table(file_path, encoding, header=0)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        except (pa.ArrowException, OSError):
+            return None
+    return None
+
+
+def tables_to_frame(tables: list, source_names: list):
+    """
+    在 Arrow 层合并多个文件的 Table，最后一次性转换为 DataFrame
+    
+    各文件的 record batch 直接拼接，省去逐文件 DataFrame 以及 concat 的整表复制；
+    源文件名以 category 列 _source_file 附加，每个文件只保存一份字符串
+    
+    Args:
+        tables: pyarrow Table 列表
+        source_names: 与 tables 一一对应的源文件名
+    
+    Returns:
+        合并后的 DataFrame；各文件列类型无法统一、或含日期/时间类型列时返回 None
+    """
+    try:
+        merged = pa.concat_tables(tables, promote_options='default')
+    except pa.ArrowException:
+        return None
+    
+    # read_csv_table 已把日期、时间列读为字符串；其他来源的 Table 若仍含这类列，
+    # 转换后会是 datetime 对象而非原文本，交给调用方逐文件读取
+    if any(pa.types.is_temporal(t) for t in merged.schema.types):
+        return None
+    
+    df = _none_to_nan(merged.to_pandas(split_blocks=True, self_destruct=True))
+    
+    # 类别按文件名排序，分组顺序与字符串列一致
+    categories, file_codes = np.unique(source_names, return_inverse=True)
+    codes = np.repeat(file_codes.ravel(), [len(t) for t in tables])
+    df['_source_file'] = pd.Categorical.from_codes(codes, categories=categories)
+    return categorize_strings(df)
+
+
+def categorize_strings(df: pd.DataFrame, threshold: float = 0.5) -> pd.DataFrame:
+    """
+    将低基数的字符串列转换为 category 类型（原地修改）
+    
+    重复的字符串（模型名、系统名等）只保存一份，按整数编码存储，
+    降低内存占用并加速后续的合并与分组
+    
+    Args:
+        df: 原始 DataFrame
+        threshold: 唯一值占比阈值，低于该值的字符串列会被转换
+    
+    Returns:
+        转换后的 DataFrame
+    """
+    if df.empty:
+        return df
+    
+    # 按位置遍历，兼容重复列名
+    for i, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(dtype):
+            continue
+        col = df.iloc[:, i]
+        # factorize 只做一次哈希即得到去重个数（不含缺失值），比 nunique 的 unique + 去 NaN 更快
+        _, uniques = col.factorize()
+        if len(uniques) / len(df) < threshold:
+            df.isetitem(i, col.astype('category'))
+    
+    return df
+
+
+def concat_frames(frames: list) -> pd.DataFrame:
+    """
+    合并多个 DataFrame，保留各文件共有的 category 列
+    
+    pd.concat 遇到类别不一致的 category 列会退化为 object，
+    此处先将类别统一为各文件类别的并集，只拼接重新映射后的整数编码；
+    其余列由 pd.concat 一次合并，不再逐文件改写 category 列
+    
+    Args:
+        frames: DataFrame 列表
+    
+    Returns:
+        合并后的 DataFrame（重建索引）
+    """
+    if len(frames) < 2 or not all(f.columns.is_unique for f in frames):
+        return pd.concat(frames, ignore_index=True)
+    
+    cat_columns = []
+    for col in frames[0].columns:
+        dtypes = [f[col].dtype if col in f.columns else None for f in frames]
+        if not all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+            continue
+        if len({d.categories.dtype for d in dtypes}) > 1 or len({d.ordered for d in dtypes}) > 1:
+            continue
+        cat_columns.append((col, dtypes))
+    
+    if not cat_columns:
+        return pd.concat(frames, ignore_index=True)
+    
+    # 列顺序与 pd.concat 一致：各文件列名按出现顺序取并集
+    columns = frames[0].columns
+    for f in frames[1:]:
+        if not f.columns.equals(columns):
+            columns = columns.union(f.columns, sort=False)
+    
+    names = [col for col, _ in cat_columns]
+    result = pd.concat([f.drop(columns=names) for f in frames], ignore_index=True)
+    
+    for col, dtypes in cat_columns:
+        categories = reduce(lambda a, b: a.union(b), (d.categories for d in dtypes))
+        codes = []
+        for f, dtype in zip(frames, dtypes):
+            file_codes = f[col].array.codes
+            if not dtype.categories.equals(categories):
+                # 末尾追加 -1，使缺失值（编码 -1）映射后仍为 -1
+                file_codes = np.append(categories.get_indexer(dtype.categories), -1)[file_codes]
+            codes.append(file_codes)
+        values = pd.Categorical.from_codes(
+            np.concatenate(codes), categories=categories, ordered=dtypes[0].ordered
+        )
+        result.insert(columns.get_loc(col), col, values)
+    
+    return result
+
+
+def inputs_fingerprint(files: list, *extra) -> str:
+    """
+    计算输入文件集合的指纹
+    
+    Args:
+        files: 文件路径列表（顺序影响合并结果，按原顺序参与计算）
+        *extra: 其他影响加载结果的参数
+    
+    Returns:
+        十六进制指纹字符串
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((DATA_CACHE_VERSION, pd.__version__) + extra).encode('utf-8'))
+    for path in files:
+        stat = os.stat(path)
+        h.update(f"{os.path.abspath(path)}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def data_cache_dir():
+    """
+    数据缓存目录：$XDG_CACHE_HOME（未设置时为 ~/.cache）下的 data_integration，不存在时以 0700 权限创建
+    
+    缓存文件名可由输入文件推算，放在所有用户可写的系统临时目录中可能被他人预先放置或篡改，
+    因此目录不属于当前用户或对其他用户开放权限时不使用缓存
+    
+    Returns:
+        目录路径；无法创建或不安全时返回 None
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    path = os.path.join(base, DATA_CACHE_DIR_NAME)
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # Windows 无 getuid，用户目录默认仅本人可访问
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+        return None
+    return path
+
+
+def _data_cache_path(fingerprint: str):
+    """数据缓存文件路径；缓存目录不可用时返回 None"""
+    cache_dir = data_cache_dir()
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, f"{DATA_CACHE_PREFIX}{fingerprint}.parquet")
+
+
+def read_data_cache(fingerprint: str):
+    """
+    读取已缓存的合并数据
+    
+    Args:
+        fingerprint: 输入文件指纹
+    
+    Returns:
+        DataFrame；未安装 pyarrow、缓存不存在或无法读取时返回 None
+    """
+    if pa is None:
+        return None
+    path = _data_cache_path(fingerprint)
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        table = pq.read_table(path)
+        columns_name = json.loads((table.schema.metadata or {}).get(DATA_CACHE_COLUMNS_NAME_KEY, b'null'))
+        df = _none_to_nan(table.to_pandas(split_blocks=True, self_destruct=True))
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+    df.columns.name = columns_name
+    
+    # 命中时刷新修改时间，常用的缓存不会被 prune_data_cache 当作过期清理
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+
+def write_data_cache(df: pd.DataFrame, fingerprint: str) -> None:
+    """
+    将合并后的数据写入 Parquet 缓存（列名重复、缓存目录不可用、文件写入失败或数据无法转为 Parquet 时跳过），
+    并清理过期的旧缓存
+    
+    Args:
+        df: 合并后的 DataFrame
+        fingerprint: 输入文件指纹
+    """
+    # Parquet 要求列名唯一且为字符串（输入文件可能含重复列名），不满足时不缓存
+    if pa is None or not df.columns.is_unique or not all(isinstance(c, str) for c in df.columns):
+        return
+    path = _data_cache_path(fingerprint)
+    if path is None:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # 列索引名称（如标准格式文件以首行作表头时为 0）写入元数据，读取时还原
+        metadata = dict(table.schema.metadata or {})
+        metadata[DATA_CACHE_COLUMNS_NAME_KEY] = json.dumps(df.columns.name).encode('utf-8')
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression='snappy')
+        os.replace(tmp_path, path)
+    except (OSError, ValueError, TypeError, pa.ArrowException):
+        # 缓存只是加速手段，任何写入失败都不影响本次加载
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    prune_data_cache()
+
+
+def prune_data_cache(max_age: float = DATA_CACHE_MAX_AGE) -> None:
+    """
+    删除缓存目录中超过 max_age 秒未更新的数据缓存文件（含中断遗留的临时文件）
+    
+    Args:
+        max_age: 保留时长（秒）；传入 0 删除全部缓存
+    """
+    cache_dir = data_cache_dir()
+    if cache_dir is None:
+        return
+    deadline = datetime.now().timestamp() - max_age
+    try:
+        with os.scandir(cache_dir) as it:
+            entries = [e for e in it if e.name.startswith(DATA_CACHE_PREFIX)]
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime <= deadline:
+                os.remove(entry.path)
+        except OSError:
+            continue  # 其他进程已删除或无权限
+
+
+def copy_on_write():
+    """
+    启用写时复制的上下文，供命令行入口包裹整个处理流程
+    
+    pandas 3 起始终写时复制；2.x 在上下文内显式启用，列子集与派生列只在写入时复制，
+    而不是立即整块复制。只在入口处启用，导入本模块不改变调用方的 pandas 全局选项
+    
+    Returns:
+        上下文管理器
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        return pd.option_context('mode.copy_on_write', True)
+    return contextlib.nullcontext()
+
+
 def get_timestamp() -> str:
     """
     获取当前时间戳字符串
@@ -76,67 +632,472 @@ def find_files(source_dir: str, pattern: str) -> list:
     """
     递归查找匹配的文件（包含所有子目录）
     
+    使用 os.scandir 单次遍历目录，直接复用目录项缓存的类型信息，省去逐个 stat
+    
     Args:
         source_dir: 源目录
         pattern: 文件匹配模式（如 *.csv）
     
     Returns:
-        匹配的文件路径列表
+        匹配的文件路径列表（已排序，保证合并顺序稳定）
     """
-    # 默认递归扫描所有子目录
-    search_pattern = os.path.join(source_dir, '**', pattern)
-    return glob(search_pattern, recursive=True)
+    # 模式中包含路径时交给 glob 处理
+    if os.sep in pattern or '/' in pattern:
+        return sorted(glob(os.path.join(source_dir, '**', pattern), recursive=True))
+    
+    # 与 glob 一致：隐藏文件/目录只有模式以 . 开头时才匹配
+    include_hidden = pattern.startswith('.')
+    
+    matches = []
+    pending = [source_dir]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.startswith('.') and not include_hidden:
+                        continue
+                    if entry.is_dir():
+                        pending.append(entry.path)
+                    elif entry.is_file() and fnmatch.fnmatch(entry.name, pattern):
+                        matches.append(entry.path)
+        except OSError:
+            continue
+    
+    return sorted(matches)
 
 
-def apply_filters(df: pd.DataFrame, filters: list) -> pd.DataFrame:
+def coerce_numeric(col: pd.Series) -> pd.Series:
     """
-    根据过滤条件筛选数据
+    将列转换为数值（无法解析的值置为 NaN），结果与 pd.to_numeric(errors='coerce') 一致
+    
+    category 列只对实际出现的类别做一次解析，再按编码展开到每一行，
+    重复的数值字符串（卡数、time_limit 等）不再逐行解析
+    
+    Args:
+        col: 原始列
+    
+    Returns:
+        数值列
+    """
+    if (col.empty or not isinstance(col.dtype, pd.CategoricalDtype)
+            or not pd.api.types.is_string_dtype(col.cat.categories.dtype)):
+        return pd.to_numeric(col, errors='coerce')
+    
+    codes = col.cat.codes.to_numpy()
+    valid = codes >= 0
+    used = np.bincount(codes[valid], minlength=len(col.cat.categories)) > 0
+    if not used.any():
+        return pd.Series(np.nan, index=col.index, name=col.name, dtype=np.float64)
+    
+    # 未出现的类别不参与解析，避免影响结果类型（如被过滤掉的小数让整数列变为浮点）
+    parsed = pd.to_numeric(pd.Series(col.cat.categories[used], dtype=object), errors='coerce').to_numpy()
+    lookup = np.zeros(len(used), dtype=parsed.dtype)
+    lookup[used] = parsed
+    values = lookup.take(codes)
+    if not valid.all():
+        values = values.astype(np.result_type(values.dtype, np.float64))
+        values[~valid] = np.nan
+    return pd.Series(values, index=col.index, name=col.name)
+
+
+def numeric_or_text(col: pd.Series) -> pd.Series:
+    """
+    排序字段数值化：能解析的值转换为数值，无法解析的文本保留原值
+    
+    所有非空值都能解析时直接返回数值列，保持数值类型，排序按数值比较；
+    否则只有数值部分被转换，文本原样保留
+    
+    Args:
+        col: 原始列
+    
+    Returns:
+        数值列，或数值与文本混合的列
+    """
+    numeric = coerce_numeric(col)
+    if not (numeric.isna().to_numpy() & col.notna().to_numpy()).any():
+        return numeric
+    return numeric.fillna(col)
+
+
+def downcast_numeric(df: pd.DataFrame, fields: list, precision: str = 'float64') -> pd.DataFrame:
+    """
+    数值列降精度（原地修改）
+    
+    int64 列在取值范围允许时转为 int32；precision 为 float32 时 float64 列转为 float32，
+    减少后续合并、分组、透视时的内存占用与带宽
     
     Args:
         df: 原始 DataFrame
-        filters: 过滤条件列表
+        fields: 需要处理的字段列表
+        precision: 浮点精度，float64（默认，不转换）或 float32
     
     Returns:
-        筛选后的 DataFrame
+        处理后的 DataFrame
     """
-    if not filters:
-        return df
+    int32 = np.iinfo(np.int32)
+    for field in fields:
+        if field not in df.columns:
+            continue
+        col = df[field]
+        if col.dtype == np.int64:
+            if col.empty or (col.min() >= int32.min and col.max() <= int32.max):
+                df[field] = col.astype(np.int32)
+        elif col.dtype == np.float64 and precision == 'float32':
+            df[field] = col.astype(np.float32)
+    return df
+
+
+def round_numeric(df: pd.DataFrame, decimals: int) -> pd.DataFrame:
+    """
+    数值列四舍五入（原地修改），结果与 df[numeric_cols].round(decimals) 回写一致
     
-    result = df.copy()
+    decimals >= 0 时整数列不受影响，只处理浮点列；逐列直接对 numpy 数组取整，
+    省去选列、round、回写三次整块复制
+    
+    Args:
+        df: 原始 DataFrame
+        decimals: 小数位数
     
-    for f in filters:
-        field = f.get('field')
+    Returns:
+        处理后的 DataFrame
+    """
+    kinds = 'fc' if decimals >= 0 else 'fciu'
+    for i, dtype in enumerate(df.dtypes):
+        if dtype.kind not in kinds:
+            continue
+        col = df.iloc[:, i]
+        # 可空扩展类型交给 pandas 处理缺失值
+        rounded = np.round(col.to_numpy(), decimals) if isinstance(dtype, np.dtype) else col.round(decimals)
+        df.isetitem(i, rounded)
+    return df
+
+
+def _numeric_filter_mask(conditions: list) -> np.ndarray:
+    """
+    将多个数值比较条件拼成一个表达式一次求值
+    
+    Args:
+        conditions: (数值数组, 操作符, 数值) 列表
+    
+    Returns:
+        布尔掩码（缺失值不满足任何条件）
+    """
+    local_dict = {}
+    terms = []
+    for i, (values, operator, value) in enumerate(conditions):
+        local_dict[f'c{i}'] = values
+        local_dict[f'v{i}'] = value
+        terms.append(f"(c{i} {operator} v{i})")
+    return np.asarray(pd.eval(' & '.join(terms), local_dict=local_dict), dtype=bool)
+
+
+def compile_filters(filters: list):
+    """
+    预先解析过滤条件，返回可重复调用的过滤函数
+    
+    配置中的字段、操作符与取值只解析一次；字段是否存在、是否为数值列等
+    依赖数据的判断在调用时进行。所有条件先合并为一个布尔掩码，最后只切片一次。
+    过滤在数值类型转换之前执行，数值范围比较（>、<、>=、<=）先把文本/类别列按
+    coerce_numeric 转为数值再比较（仅用于比较，不改写原列），无法解析的值视为不满足
+    
+    Args:
+        filters: 过滤条件列表
+    
+    Returns:
+        过滤函数 f(df) -> 筛选后的 DataFrame
+    """
+    conditions = []
+    for f in filters or []:
         operator = f.get('operator', '==')
         values = f.get('values', [])
+        value = values[0] if len(values) == 1 else values
+        conditions.append((f.get('field'), operator, value, values))
+    
+    def _apply(df: pd.DataFrame) -> pd.DataFrame:
+        masks = []
+        numeric_conditions = []
         
-        if field not in result.columns:
-            print(f"警告: 过滤字段 '{field}' 不存在，已跳过")
-            continue
+        for field, operator, value, values in conditions:
+            if field not in df.columns:
+                print(f"警告: 过滤字段 '{field}' 不存在，已跳过")
+                continue
+            
+            if not values:
+                continue
+            
+            column = df[field]
+            
+            if operator in NUMERIC_OPERATORS and isinstance(value, (int, float)):
+                if not pd.api.types.is_numeric_dtype(column):
+                    column = coerce_numeric(column)
+                if isinstance(column.dtype, np.dtype):
+                    numbers = column.to_numpy()
+                else:
+                    # 可空扩展类型（Int64 等）的缺失值转为 NaN
+                    numbers = column.to_numpy(dtype=np.float64, na_value=np.nan)
+                numeric_conditions.append((numbers, operator, value))
+                continue
+            
+            if operator in COMPARE_OPERATORS:
+                condition = COMPARE_OPERATORS[operator](column, value)
+            elif operator == 'in':
+                condition = column.isin(values)
+            elif operator == 'not_in':
+                condition = ~column.isin(values)
+            else:
+                print(f"警告: 未知操作符 '{operator}'，已跳过")
+                continue
+            
+            masks.append(condition.to_numpy(dtype=bool, na_value=False))
         
-        if not values:
-            continue
+        if numeric_conditions:
+            masks.append(_numeric_filter_mask(numeric_conditions))
         
-        value = values[0] if len(values) == 1 else values
+        if not masks:
+            return df
         
-        if operator == '==':
-            result = result[result[field] == value]
-        elif operator == '!=':
-            result = result[result[field] != value]
-        elif operator == '>':
-            result = result[result[field] > value]
-        elif operator == '<':
-            result = result[result[field] < value]
-        elif operator == '>=':
-            result = result[result[field] >= value]
-        elif operator == '<=':
-            result = result[result[field] <= value]
-        elif operator == 'in':
-            result = result[result[field].isin(values)]
-        elif operator == 'not_in':
-            result = result[~result[field].isin(values)]
+        # take 返回独立的新对象，后续写列不会触发 SettingWithCopyWarning
+        return df.take(np.flatnonzero(np.logical_and.reduce(masks)))
+    
+    return _apply
+
+
+def apply_filters(df: pd.DataFrame, filters: list) -> pd.DataFrame:
+    """
+    根据过滤条件筛选数据
+    
+    Args:
+        df: 原始 DataFrame
+        filters: 过滤条件列表
+    
+    Returns:
+        筛选后的 DataFrame
+    """
+    if not filters:
+        return df
+    return compile_filters(filters)(df)
+
+
+def compile_system_order(system_order: list):
+    """
+    预先编译 system_order 排序规则，返回系统名 -> 排序优先级的函数
+    
+    规则不区分大小写："*KEY*" 为包含、"*KEY" 为后缀、"KEY*" 为前缀，其余为精确匹配。
+    各规则按配置顺序合并为一个正则的分支，整串匹配时第一个匹配成功的分支即为最靠前的规则，
+    每个系统名只需转换一次大小写、匹配一次
+    
+    Args:
+        system_order: 排序规则列表
+    
+    Returns:
+        函数 f(system_name) -> 优先级（未匹配任何规则时为规则数）
+    """
+    branches = []
+    for pattern in system_order:
+        if pattern.startswith('*') and pattern.endswith('*'):
+            body = '.*' + re.escape(pattern[1:-1].upper()) + '.*'
+        elif pattern.startswith('*'):
+            body = '.*' + re.escape(pattern[1:].upper())
+        elif pattern.endswith('*'):
+            body = re.escape(pattern[:-1].upper()) + '.*'
         else:
-            print(f"警告: 未知操作符 '{operator}'，已跳过")
+            body = re.escape(pattern.upper())
+        branches.append(f'({body})')
+    
+    matcher = re.compile('|'.join(branches), re.DOTALL)
+    unmatched = len(branches)
     
+    def _rank(system_name) -> int:
+        match = matcher.fullmatch(str(system_name).upper())
+        return match.lastindex - 1 if match and match.lastindex else unmatched
+    
+    return _rank
+
+
+def _present_codes(codes: np.ndarray, size: int) -> np.ndarray:
+    """出现过的编码（升序），编码取值范围为 [0, size)；按标记代替排序去重"""
+    mark = np.zeros(size, dtype=bool)
+    mark[codes] = True
+    return np.flatnonzero(mark)
+
+
+def _dense_codes(codes: np.ndarray, size: int):
+    """将编码压缩为 0..k-1：返回 (出现过的编码, 压缩后的编码)，等价于 np.unique(return_inverse=True)"""
+    used = _present_codes(codes, size)
+    remap = np.empty(size, dtype=np.intp)
+    remap[used] = np.arange(len(used))
+    return used, remap[codes]
+
+
+def _first_positions(keys: np.ndarray, size: int) -> np.ndarray:
+    """
+    每个取值首次出现的位置（按取值升序），取值范围为 [0, size)
+    
+    等价于 np.unique(keys, return_index=True)[1]，用 minimum.at 一次散射代替排序
+    """
+    first = np.full(size, len(keys), dtype=np.intp)
+    np.minimum.at(first, keys, np.arange(len(keys)))
+    return first[first < len(keys)]
+
+
+def _factorize_keys(arrays: list, names: list):
+    """
+    多列联合编码
+    
+    Args:
+        arrays: 各键列的值（不含缺失值）
+        names: 键列名
+    
+    Returns:
+        (codes, index): 每行所属组合的编码，以及按键排序的唯一组合
+    """
+    mi = pd.MultiIndex.from_arrays(arrays, names=names)
+    level_codes = [np.asarray(c, dtype=np.int64) for c in mi.codes]
+    shape = tuple(len(level) for level in mi.levels)
+    
+    # 各层编码合成单个整数键，排序后即为多列字典序
+    combined = np.ravel_multi_index(level_codes, shape)
+    size = math.prod(shape)
+    if size <= 4 * len(combined) + 1024:
+        # 键空间不大时按整数键直接散射定位，代替排序
+        first = _first_positions(combined, size)
+        remap = np.empty(size, dtype=np.intp)
+        remap[combined[first]] = np.arange(len(first))
+        codes = remap[combined]
+    else:
+        _, first, codes = np.unique(combined, return_index=True, return_inverse=True)
+    
+    index = pd.MultiIndex(levels=mi.levels, codes=[c[first] for c in level_codes], names=names)
+    if len(names) == 1:
+        index = index.get_level_values(0)
+    return codes.ravel(), index
+
+
+def factorize_keys(df: pd.DataFrame, fields: list):
+    """
+    对键字段做联合编码，供多次透视复用
+    
+    Args:
+        df: 原始 DataFrame
+        fields: 键字段列表
+    
+    Returns:
+        (codes, index): 每行所属组合的编码（任一键缺失时为 -1），以及按键排序的唯一组合
+    """
+    valid = np.ones(len(df), dtype=bool)
+    for field in fields:
+        valid &= df[field].notna().to_numpy()
+    
+    # 键列无缺失（常见情况）时直接编码整列，省去逐列布尔筛选的复制；
+    # category 键列（加载时已转换的字符串列、标签列）按整数编码参与联合编码，不再对字符串哈希
+    if valid.all():
+        sub_codes, index = _factorize_keys([df[f] for f in fields], fields)
+        return sub_codes.astype(np.intp, copy=False), index
+    
+    codes = np.full(len(df), -1, dtype=np.intp)
+    sub_codes, index = _factorize_keys([df[f][valid] for f in fields], fields)
+    codes[valid] = sub_codes
+    return codes, index
+
+
+def _first_cells(codes: np.ndarray, n_rows: int, col_keys, valid: np.ndarray):
+    """
+    定位每个 (行键, 列键) 单元格中第一个有效值所在的行
+    
+    Args:
+        codes: 行键编码（缺失为 -1）
+        n_rows: 行键组合数
+        col_keys: factorize_keys 返回的列键 (codes, index)；为 None 时只按行键分组
+        valid: 值非空的掩码
+    
+    Returns:
+        (used_rows, used_cols, rows, cols, src)：出现过的行键编码、列键编码（只按行键分组时均为 None），
+        以及各单元格的行键编码、列序号与取值所在行
+    """
+    if col_keys is None:
+        positions = np.flatnonzero((codes >= 0) & valid)
+        src = positions[_first_positions(codes[positions], n_rows)]
+        return None, None, codes[src], np.zeros(len(src), dtype=np.intp), src
+    
+    col_codes, col_index = col_keys
+    positions = np.flatnonzero((np.minimum(codes, col_codes) >= 0) & valid)
+    used_rows, rows = _dense_codes(codes[positions], n_rows)
+    used_cols, cols = _dense_codes(col_codes[positions], len(col_index))
+    # 同一单元格出现多次时保留首次出现的值
+    first = _first_positions(rows * len(used_cols) + cols, len(used_rows) * len(used_cols))
+    src = positions[first]
+    return used_rows, used_cols, codes[src], cols[first], src
+
+
+def pivot_first_blocks(row_keys: tuple, blocks: list, descending: bool = False) -> pd.DataFrame:
+    """
+    多个值列共用行键一次透视（每个单元格取第一个非空值），直接写入同一张宽表
+
+    各块按编码写入结果列，省去逐块生成 DataFrame 再按索引对齐拼接；
+    行顺序与依次 concat(axis=1) 各块单独透视的结果一致
+
+    Args:
+        row_keys: factorize_keys 返回的行键 (codes, index)
+        blocks: [(name, values, col_keys)] 列表；col_keys 为 None 时该块只输出一列 name
+                （按行键取每组第一个非空值），否则按列键展开为 (name, 列键值) 多列
+        descending: 展开列是否按列键降序排列
+
+    Returns:
+        以唯一行键组合为索引的宽表
+    """
+    if not blocks:
+        raise ValueError("没有可透视的值列")
+
+    codes, index = row_keys
+    present = _present_codes(codes[codes >= 0], len(index))
+
+    # 先确定每块的有效单元格，行顺序按块依次追加新出现的组合（与 concat 的索引并集一致）；
+    # 值列无缺失时单元格布局只取决于列键，同一列键的各块共用一次计算
+    layouts = {}
+    cells = []
+    order = None
+    for name, values, col_keys in blocks:
+        vals = values.to_numpy()
+        valid = values.notna().to_numpy()
+        complete = valid.all()
+        layout = layouts.get(id(col_keys)) if complete else None
+        if layout is None:
+            layout = _first_cells(codes, len(index), col_keys, valid)
+            if complete:
+                layouts[id(col_keys)] = layout
+        used_rows, used_cols, rows, cols, src = layout
+
+        if col_keys is None:
+            used_rows = present
+            labels = [name]
+            # 整数列不含空值，每组都有有效值，保持原类型
+            dtype = vals.dtype if np.issubdtype(vals.dtype, np.integer) else np.result_type(vals.dtype, np.float64)
+        else:
+            if descending:
+                used_cols = used_cols[::-1]
+                cols = len(used_cols) - 1 - cols
+            labels = [(name, key) for key in col_keys[1][used_cols]]
+            dtype = np.result_type(vals.dtype, np.float64)
+
+        if order is None:
+            order = used_rows
+        else:
+            order = np.concatenate([order, used_rows[~np.isin(used_rows, order)]])
+        cells.append((rows, cols, vals[src], labels, dtype))
+
+    slot = np.full(len(index), -1, dtype=np.intp)
+    slot[order] = np.arange(len(order))
+
+    columns, arrays = [], []
+    for rows, cols, vals, labels, dtype in cells:
+        out = np.full((len(order), len(labels)), np.nan if dtype.kind in 'fcO' else 0, dtype=dtype)
+        out[slot[rows], cols] = vals
+        columns.extend(labels)
+        arrays.extend(out.T)
+
+    result = pd.DataFrame(dict(enumerate(arrays)), index=index[order])
+    result.columns = pd.Index(columns, tupleize_cols=False)
     return result
 
 
@@ -159,13 +1120,61 @@ def transpose_wide_format(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         转置后的 DataFrame
     """
-    # 设置第一列为索引，然后转置
-    transposed = df.set_index(df.columns[0]).T
+    # 整表取为一个二维数组直接转置：宽格式的列数等于运行次数，
+    # set_index().T 会逐列构造对象，运行次数多时开销远大于读取本身
+    return _transpose_wide_values(df.to_numpy(), df.columns[0])
+
+
+def _transpose_wide_values(values: np.ndarray, name) -> pd.DataFrame:
+    """将宽格式的二维数组（每行一个字段，首列为字段名）转置为 DataFrame"""
+    return pd.DataFrame(values[:, 1:].T, columns=pd.Index(values[:, 0], name=name))
+
+
+def read_wide_format(file_path: str):
+    """
+    按行解析宽格式 CSV 并转置（首行首个单元格为字段名标记时）
     
-    # 重置索引
-    transposed = transposed.reset_index(drop=True)
+    宽格式的列数等于运行次数，pyarrow / pandas 按列解析时每列都要单独建对象，
+    运行次数多时读取远慢于按行解析；结果与 smart_read_csv(header=None, dtype=str)
+    后 transpose_wide_format 一致
     
-    return transposed
+    Args:
+        file_path: CSV 文件路径
+    
+    Returns:
+        转置后的 DataFrame；不是此类宽格式、各行字段数不一致或无法解码时返回 None
+    """
+    for encoding in _encoding_candidates(detect_encoding(file_path)):
+        # 与 pandas 一致，utf-8 也跳过 BOM
+        if encoding == 'utf-8':
+            encoding = 'utf-8-sig'
+        try:
+            with open(file_path, 'r', encoding=encoding, newline='') as f:
+                reader = csv.reader(f)
+                first = next(reader, [])
+                if not first or first[0] not in WIDE_FORMAT_MARKERS:
+                    return None
+                
+                width = len(first)
+                rows = [first]
+                for row in reader:
+                    # 与 pandas 一致跳过空行；字段数不一致的文件交给常规解析器处理
+                    if not row:
+                        continue
+                    if len(row) != width:
+                        return None
+                    rows.append(row)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        except csv.Error:
+            return None
+        
+        values = np.array(rows, dtype=object)
+        # 缺失值文本统一为 NaN
+        values[np.vectorize(CSV_NA_VALUES.__contains__, otypes=[bool])(values)] = np.nan
+        return _transpose_wide_values(values, 0)
+    
+    return None
 
 
 def format_output_filename(template: str) -> str:
@@ -179,3 +1188,86 @@ def format_output_filename(template: str) -> str:
         格式化后的文件名
     """
     return template.replace("{timestamp}", get_timestamp())
+
+
+def apply_output_format(filename: str, output_format: str) -> str:
+    """
+    按输出格式替换文件扩展名
+    
+    Args:
+        filename: 文件名
+        output_format: 输出格式（xlsx / parquet / csv）
+    
+    Returns:
+        替换扩展名后的文件名
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"不支持的输出格式: {output_format}，可选: {', '.join(OUTPUT_FORMATS)}")
+    name, _ = os.path.splitext(filename)
+    return name + OUTPUT_FORMATS[output_format]
+
+
+def export_dataframe(df: pd.DataFrame, output_path: str) -> None:
+    """
+    按扩展名导出 DataFrame
+    
+    Excel 使用 xlsxwriter 的 constant_memory 模式逐行写出，内存占用与行数无关；
+    Parquet / CSV 适合数据量大、无需人工查看格式的场景
+    
+    Args:
+        df: 要导出的 DataFrame
+        output_path: 输出文件路径
+    """
+    ext = os.path.splitext(output_path)[1].lower()
+    if ext == '.parquet':
+        df.to_parquet(output_path, engine='pyarrow', compression='snappy', index=False)
+    elif ext == '.csv':
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    else:
+        with pd.ExcelWriter(output_path, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True}}) as writer:
+            _write_excel_rows(writer, 'Sheet1', df)
+
+
+def _write_excel_rows(writer, sheet_name: str, df: pd.DataFrame) -> None:
+    """
+    按行顺序写入表头与数据（constant_memory 模式只接受逐行写入，
+    pandas 的 to_excel 按列写单元格，不能直接使用）
+    
+    Args:
+        writer: xlsxwriter 引擎的 ExcelWriter
+        sheet_name: Sheet 名称
+        df: 要写入的 DataFrame
+    """
+    workbook = writer.book
+    worksheet = workbook.add_worksheet(sheet_name)
+    
+    # 与 pandas to_excel 默认表头样式一致：加粗、细边框、水平居中
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    worksheet.write_row(0, 0, list(df.columns), header_format)
+    
+    # 与 pandas to_excel 默认的单元格格式一致：日期/日期时间带数字格式，时长按天数写入，
+    # 否则 xlsxwriter 只写出裸的 Excel 序列号
+    datetime_format = workbook.add_format({'num_format': 'YYYY-MM-DD HH:MM:SS'})
+    date_format = workbook.add_format({'num_format': 'YYYY-MM-DD'})
+    duration_format = workbook.add_format({'num_format': '0'})
+    
+    # tolist 将 numpy 标量转换为 Python 原生类型，供 xlsxwriter 识别
+    columns = [df.iloc[:, i].tolist() for i in range(df.shape[1])]
+    for row_idx, row in enumerate(zip(*columns), start=1):
+        for col_idx, value in enumerate(row):
+            if pd.isna(value):
+                continue
+            if isinstance(value, (bool, int, float, str)):
+                if isinstance(value, float) and np.isinf(value):
+                    value = 'inf' if value > 0 else '-inf'
+                worksheet.write(row_idx, col_idx, value)
+            elif isinstance(value, datetime):
+                worksheet.write_datetime(row_idx, col_idx, value, datetime_format)
+            elif isinstance(value, dt.date):
+                worksheet.write_datetime(row_idx, col_idx, value, date_format)
+            elif isinstance(value, dt.timedelta):
+                worksheet.write_number(row_idx, col_idx, value.total_seconds() / 86400, duration_format)
+            else:
+                # 其他对象（time、Decimal 等）与 pandas 一样按文本写入
+                worksheet.write_string(row_idx, col_idx, str(value))
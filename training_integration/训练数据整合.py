@@ -1,10 +1,14 @@
 import pandas as pd
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import export_dataframe
 
 # --- 配置区域 ---
 # 存放 CSV 文件的目录路径
 SOURCE_DIRECTORY = './raw_data/training/' 
-# 输出的文件名
+# 输出的文件名（扩展名决定格式：.xlsx / .parquet / .csv）
 OUTPUT_FILE = './data/training/aggregated_data_report.xlsx'
 
 # 指定的关键字段名列表（保持你提供的顺序）
@@ -19,9 +23,55 @@ TARGET_FIELDS = [
 ]
 # ----------------
 
-def main():
-    all_rows = []
+def read_text(file_path):
+    # 尝试不同编码以防止中文乱码
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('gbk')
+
+def read_first_row(file_path):
+    # 只读一次原始字节，先按 utf-8-sig 解码，失败再按 gbk 解码，避免非 UTF-8 文件被读取两遍；
+    # 解码后只解析表头和第一行数据
+    return pd.read_csv(io.StringIO(read_text(file_path)), nrows=1)
+
+def process_file(filename):
+    # 读取单个 CSV 并提取首行的关键字段，返回 (行数据或 None, 需要打印的提示或 None)
+    file_path = os.path.join(SOURCE_DIRECTORY, filename)
+    
+    try:
+        # 1. 读取传统 CSV（首行为表头）
+        # 只用到第一行，nrows=1 让解析器读完首行即停止，不再解析整个文件
+        df = read_first_row(file_path)
+
+        if df.empty:
+            return None, f"警告：文件 {filename} 为空，已跳过。"
 
+        # 2. 提取数据
+        # 创建一行数据，首位是文件名
+        row_data = {'File_Name': filename}
+        
+        # 提取该文件第一行中对应的字段
+        first_row = df.iloc[0]
+        for field in TARGET_FIELDS:
+            if field in df.columns:
+                val = first_row[field]
+                # 尝试转为数值，无法转换则保留原样
+                try:
+                    row_data[field] = pd.to_numeric(val)
+                except (ValueError, TypeError):
+                    row_data[field] = val
+            else:
+                row_data[field] = None # 字段不存在则填空
+
+        return row_data, None
+
+    except Exception as e:
+        return None, f"处理文件 {filename} 时发生错误: {e}"
+
+def main():
     # 检查目录
     if not os.path.exists(SOURCE_DIRECTORY):
         print(f"错误：目录 '{SOURCE_DIRECTORY}' 不存在。")
@@ -36,42 +86,14 @@ def main():
 
     print(f"正在处理 {len(csv_files)} 个文件...")
 
-    for filename in csv_files:
-        file_path = os.path.join(SOURCE_DIRECTORY, filename)
-        
-        try:
-            # 1. 读取传统 CSV（首行为表头）
-            # 尝试不同编码以防止中文乱码
-            try:
-                df = pd.read_csv(file_path, encoding='utf-8-sig')
-            except:
-                df = pd.read_csv(file_path, encoding='gbk')
-
-            if df.empty:
-                print(f"警告：文件 {filename} 为空，已跳过。")
-                continue
-
-            # 2. 提取数据
-            # 创建一行数据，首位是文件名
-            row_data = {'File_Name': filename}
-            
-            # 提取该文件第一行中对应的字段
-            first_row = df.iloc[0]
-            for field in TARGET_FIELDS:
-                if field in df.columns:
-                    val = first_row[field]
-                    # 尝试转为数值，无法转换则保留原样
-                    try:
-                        row_data[field] = pd.to_numeric(val)
-                    except (ValueError, TypeError):
-                        row_data[field] = val
-                else:
-                    row_data[field] = None # 字段不存在则填空
-
-            all_rows.append(row_data)
-
-        except Exception as e:
-            print(f"处理文件 {filename} 时发生错误: {e}")
+    # 各文件相互独立，多线程并发读取（CSV 解析在 C 层释放 GIL）；按文件顺序收集结果和提示
+    all_rows = []
+    with ThreadPoolExecutor(max_workers=min(16, (os.cpu_count() or 1) * 2)) as executor:
+        for row_data, message in executor.map(process_file, csv_files):
+            if message:
+                print(message)
+            if row_data is not None:
+                all_rows.append(row_data)
 
     # 3. 汇总并导出
     if all_rows:
@@ -84,8 +106,8 @@ def main():
         
         result_df = result_df[final_columns]
 
-        # 导出为 Excel (xlsx) 避免乱码
-        result_df.to_excel(OUTPUT_FILE, index=False)
+        # 导出为 Excel (xlsx) 避免乱码；xlsxwriter 逐行写出，不在内存中缓存整个工作簿
+        export_dataframe(result_df, OUTPUT_FILE)
         print(f"--- 任务完成 ---")
         print(f"汇总结果已保存至: {OUTPUT_FILE}")
     else:
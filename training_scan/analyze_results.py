@@ -1,13 +1,42 @@
 import pandas as pd
-import glob
 import os
 import yaml
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML 未编译 libyaml 扩展时使用纯 Python 解析器
+    from yaml import SafeLoader as YamlLoader
+
+def extract_test_value(file_path, value_pattern):
+    filename = os.path.basename(file_path)
+    
+    # 正则解析：匹配 参数名_数值_ (数值可能包含点或科学计数法)
+    # 这样可以无视后面的 arrange.csv 后缀
+    match = value_pattern.search(filename)
+    
+    if match:
+        return match.group(1)
+    # 备选提取：res_runtime_param_val_arrange.csv -> 倒数第二个是 val
+    return filename.split('_')[-2]
+
+def read_first_row(file_path, param_col_name, value_pattern):
+    # 只读首行，返回 {参数列: 测试值, 各字段: 首行值}；无数据行时返回 None
+    df = pd.read_csv(file_path, nrows=1)
+    if df.empty:
+        return None
+    if param_col_name in df.columns:
+        raise ValueError(f"cannot insert {param_col_name}, already exists")
+    # to_dict 逐列取值，保留各列自身类型（iloc[0] 会把整数与浮点列统一为浮点）
+    row = {param_col_name: extract_test_value(file_path, value_pattern)}
+    row.update(df.to_dict('records')[0])
+    return row
 
 def merge_arrange_results():
     try:
         with open("./automatic/config.yaml", "r") as f:
-            conf = yaml.safe_load(f)
+            conf = yaml.load(f, Loader=YamlLoader)
     except FileNotFoundError:
         print("错误：未找到 config.yaml。")
         return
@@ -22,40 +51,39 @@ def merge_arrange_results():
 
     # 依然搜索带有 arrange 后缀的文件，因为这是后续脚本生成的
     test_folder_name = f"{runtime_prefix}_{param_col_name}_scan"
-    search_pattern = os.path.join(output_root, test_folder_name, "*arrange.csv")
-    target_files = glob.glob(search_pattern)
+    # os.scandir 单次遍历目录，按文件名后缀筛选（与 glob 的 *arrange.csv 一致，跳过隐藏文件）
+    search_dir = os.path.join(output_root, test_folder_name)
+    try:
+        with os.scandir(search_dir) as entries:
+            target_files = [entry.path for entry in entries
+                            if entry.name.endswith("arrange.csv") and not entry.name.startswith('.')]
+    except OSError:
+        target_files = []
 
     if not target_files:
         print(f"未在 {test_folder_name} 下找到匹配的 *arrange.csv 文件。")
         return
 
-    all_rows = []
     print(f"正在分析前缀为 {runtime_prefix} 的结果...")
 
-    for file_path in target_files:
-        try:
-            df = pd.read_csv(file_path, nrows=1)
-            if not df.empty:
-                filename = os.path.basename(file_path)
-                
-                # 正则解析：匹配 参数名_数值_ (数值可能包含点或科学计数法)
-                # 这样可以无视后面的 arrange.csv 后缀
-                pattern = rf"_{param_col_name}_([\d\.]+)_"
-                match = re.search(pattern, filename)
-                
-                if match:
-                    test_val = match.group(1)
-                else:
-                    # 备选提取：res_runtime_param_val_arrange.csv -> 倒数第二个是 val
-                    test_val = filename.split('_')[-2]
+    # 参数名按字面匹配；数值允许带指数部分（如 1e-05、1e+16）
+    value_pattern = re.compile(rf"_{re.escape(param_col_name)}_([\d\.]+(?:[eE][+-]?\d+)?)_")
 
-                df.insert(0, param_col_name, test_val)
-                all_rows.append(df)
-        except Exception as e:
-            print(f"处理 {filename} 失败: {e}")
+    # 各文件只读首行，相互独立，多线程并发读取；结果按文件顺序收集
+    all_rows = []
+    with ThreadPoolExecutor(max_workers=min(32, len(target_files))) as executor:
+        futures = [executor.submit(read_first_row, p, param_col_name, value_pattern) for p in target_files]
+        for file_path, future in zip(target_files, futures):
+            try:
+                row = future.result()
+                if row is not None:
+                    all_rows.append(row)
+            except Exception as e:
+                print(f"处理 {os.path.basename(file_path)} 失败: {e}")
 
     if all_rows:
-        final_df = pd.concat(all_rows, ignore_index=True)
+        # 所有行收集完后一次构建 DataFrame，不再逐文件构建单行 DataFrame 再合并
+        final_df = pd.DataFrame(all_rows)
 
         # 核心修复：将排序列强制转为数字，避免 str 和 float 混合排序报错
         final_df[param_col_name] = pd.to_numeric(final_df[param_col_name], errors='coerce')
@@ -1,7 +1,18 @@
 import json
+import math
 import os
 import yaml
-import copy
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML 未编译 libyaml 扩展时使用纯 Python 解析器
+    from yaml import SafeLoader as YamlLoader
 
 def get_test_values(conf):
     ts = conf['test_setting']
@@ -19,9 +30,44 @@ def set_nested_value(data, path, value):
         curr = curr[key]
     curr[path[-1]] = value
 
+def load_json_text(text):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+def has_non_finite(obj):
+    # 是否含 NaN / Infinity 浮点数：orjson 会把它们写成 null，此时改用标准库原样写出
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(has_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(has_non_finite(v) for v in obj)
+    return False
+
+def write_json(item):
+    # orjson 的输出与 json.dumps(indent=2) 语义等价，但格式不完全相同：
+    # 浮点数写法不同（如 1e-05 写作 0.00001），非 ASCII 字符直接写 UTF-8 而不是 \uXXXX 转义
+    path, data = item
+    if orjson is not None and not has_non_finite(data):
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            content = None
+        if content is not None:
+            with open(path, 'wb') as f:
+                f.write(content)
+            return
+    # 整体序列化后一次写入，避免 json.dump 逐片段写文件
+    with open(path, 'w') as f:
+        f.write(json.dumps(data, indent=2))
+
 def generate():
     with open("./automatic/config.yaml", "r") as f:
-        conf = yaml.safe_load(f)
+        conf = yaml.load(f, Loader=YamlLoader)
     
     paths = conf['paths']
     ts = conf['test_setting']
@@ -29,8 +75,9 @@ def generate():
     runtime_prefix = os.path.splitext(os.path.basename(paths['base_runtime']))[0]
     param_name = ts['param_name']
     
+    # 基础配置只读取一次文本，每个测试值重新解析出独立副本（比 deepcopy 快）
     with open(paths['base_system'], 'r') as f:
-        base_system = json.load(f)
+        base_system_text = f.read()
     
     test_folder_name = f"{runtime_prefix}_{param_name}_scan"
     current_output_dir = os.path.join(paths['output_root'], test_folder_name)
@@ -40,16 +87,16 @@ def generate():
 
     test_values = get_test_values(conf)
     commands = []
+    systems = []
 
     for val in test_values:
-        new_system = copy.deepcopy(base_system)
+        new_system = load_json_text(base_system_text)
         set_nested_value(new_system, ts['param_path'], val)
         new_system["name"] = f"{runtime_prefix}_{param_name}_{val}"
         
         sys_filename = f"sys_{runtime_prefix}_{param_name}_{val}.json"
         sys_path = os.path.join(paths['system_gen_dir'], sys_filename)
-        with open(sys_path, 'w') as f:
-            json.dump(new_system, f, indent=2)
+        systems.append((sys_path, new_system))
 
 
         res_filename = f"{runtime_prefix}_{param_name}_{val}.csv"
@@ -65,6 +112,11 @@ def generate():
         )
         commands.append(cmd)
 
+    # 各系统配置相互独立，并行写入
+    if systems:
+        with ThreadPoolExecutor(max_workers=min(8, len(systems))) as executor:
+            list(executor.map(write_json, systems))
+
     with open(paths['commands_file'], 'w') as f:
         f.write("#!/bin/bash\n" + "\n".join(commands))
     